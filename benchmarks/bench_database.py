@@ -0,0 +1,87 @@
+"""Database 方法延迟对比：每次调用新建连接 vs 每线程长连接（WAL）
+
+用法: python benchmarks/bench_database.py [--tasks 2000] [--repeat 200]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import Database
+
+
+class ConnectPerCallDatabase(Database):
+    """模拟改动前的行为：每次调用都新建连接，使用默认的 DELETE 日志模式"""
+
+    def _get_connection(self):
+        return sqlite3.connect(self.db_file)
+
+
+def populate(db, count):
+    for i in range(count):
+        db.add_task({
+            "name": f"任务 {i}",
+            "priority": ("高", "中", "低")[i % 3],
+            "deadline": "2025-01-20",
+            "tags": "工作",
+        })
+
+
+def measure(func, repeat):
+    """返回每次调用的平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run_cases(db, repeat):
+    task_id = db.get_all_tasks()[0][0]
+    new_task = {"name": "基准任务", "priority": "中", "deadline": "2025-01-20"}
+    cases = [
+        ("add_task", lambda: db.add_task(new_task)),
+        ("add_tasks x100", lambda: db.add_tasks([new_task] * 100)),
+        ("get_all_tasks", db.get_all_tasks),
+        ("update_task_progress", lambda: db.update_task_progress(task_id, 50)),
+        ("update_task", lambda: db.update_task({**new_task, "id": task_id})),
+        ("get_task_statistics", db.get_task_statistics),
+        ("update_sync_status", lambda: db.update_sync_status(task_id, "synced")),
+        ("get_unsynced_tasks", db.get_unsynced_tasks),
+        ("increment_sync_version", lambda: db.increment_sync_version(task_id)),
+    ]
+    return {name: measure(func, repeat) for name, func in cases}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # 屏蔽 add_task/update_task 中的打印输出
+    stdout = sys.stdout
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cls in (("before", ConnectPerCallDatabase), ("after", Database)):
+            db = cls(os.path.join(tmp, f"{label}.db"))
+            sys.stdout = open(os.devnull, "w")
+            try:
+                populate(db, args.tasks)
+                results[label] = run_cases(db, args.repeat)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+                db.close()
+
+    print(f"{'method':<24}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name, before in results["before"].items():
+        after = results["after"][name]
+        print(f"{name:<24}{before:>14.3f}{after:>14.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
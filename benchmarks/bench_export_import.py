@@ -0,0 +1,85 @@
+"""流式导出 / 导入基准：JSON Lines 导出、导入新库、再次导入（全部走更新分支）
+
+报告每一步的吞吐量（任务数/秒）与 tracemalloc 内存峰值（另跑一次测得，不影响计时）。
+导出按页读取、导入按块写入，内存峰值应与任务数无关。
+
+用法: python benchmarks/bench_export_import.py [--tasks 10000 100000] [--chunk 1000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import Database, IMPORT_CHUNK_SIZE
+
+
+def fill(db, count):
+    """向空数据库写入 count 个任务（ID 为 1..count），约一半带 1-3 个子任务"""
+    rng = random.Random(0)
+    db.add_tasks([
+        {"name": f"任务 {i}", "priority": ("高", "中", "低")[i % 3],
+         "deadline": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+         "tags": ("工作", "学习", "个人")[i % 3]}
+        for i in range(count)])
+    db.add_subtasks([
+        {"task_id": task_id, "name": f"子任务 {j}", "target_time": rng.randrange(10, 120)}
+        for task_id in range(1, count + 1) for j in range(rng.choice((0, 0, 1, 2, 3)))])
+
+
+def measure(func):
+    """返回 (行数, 耗时, 内存峰值)；耗时取未开启 tracemalloc 的一次运行，峰值另跑一次"""
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--chunk", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    serial = itertools.count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.tasks:
+            source = Database(os.path.join(tmp, f"source-{count}.db"))
+            fill(source, count)
+            path = os.path.join(tmp, f"tasks-{count}.jsonl")
+            source.export_tasks(path)
+            # 再次导入的目标库：已包含全部任务，导入全部走更新分支
+            existing = Database(os.path.join(tmp, f"existing-{count}.db"))
+            existing.import_tasks_file(path, args.chunk)
+
+            def import_new():
+                # measure 会运行两次，每次导入一个新的空库
+                db = Database(os.path.join(tmp, f"import-{count}-{next(serial)}.db"))
+                return db.import_tasks_file(path, args.chunk)
+
+            steps = [
+                ("export", lambda: source.export_tasks(path)),
+                ("import", import_new),
+                ("re-import", lambda: existing.import_tasks_file(path, args.chunk)),
+            ]
+            print(f"{count} tasks")
+            print(f"{'step':<12}{'rows':>9}{'time (s)':>10}{'rows/s':>11}{'peak (MB)':>11}")
+            for name, func in steps:
+                rows, elapsed, peak = measure(func)
+                print(f"{name:<12}{rows:>9}{elapsed:>10.2f}{rows / elapsed:>11.0f}"
+                      f"{peak / 1024 / 1024:>11.1f}")
+            print(f"file size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+            print()
+
+if __name__ == "__main__":
+    main()
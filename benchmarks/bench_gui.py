@@ -0,0 +1,195 @@
+"""MainWindow 离屏渲染基准：不同任务数量下的加载时间、峰值内存、控件数量，以及单任务编辑、添加与删除的刷新时间
+
+每个任务数量在独立的子进程中运行（QT_QPA_PLATFORM=offscreen），峰值 RSS 互不影响。
+结果以 JSON 写入 --output，便于在不同提交之间比较。
+
+用法: python benchmarks/bench_gui.py [--tasks 1000 10000 50000] [--edits 20] [--output bench_gui.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 超过该时间仍未完成视为失败（秒）
+WAIT_TIMEOUT = 120
+
+
+def populate(db, count):
+    db.add_tasks({
+        "name": f"任务 {i}",
+        "priority": ("高", "中", "低")[i % 3],
+        "deadline": f"2025-01-{i % 28 + 1:02d}",
+        "tags": ("工作", "学习", "个人")[i % 3],
+    } for i in range(count))
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上 ru_maxrss 的单位是字节，Linux 上是 KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_worker(count, edits):
+    """在当前进程中测量一个任务数量，返回结果字典"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from models.database import Database
+
+    app = QApplication([])
+
+    def wait_until(condition):
+        deadline = time.perf_counter() + WAIT_TIMEOUT
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("等待界面更新超时")
+            app.processEvents()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "tasks.db"))
+        start = time.perf_counter()
+        populate(db, count)
+        insert_ms = (time.perf_counter() - start) * 1000
+        rss_before_window = peak_rss_kb()
+
+        start = time.perf_counter()
+        from gui.main_window import MainWindow
+        window = MainWindow(db)
+        window.resize(800, 600)
+        window.show()
+        construct_ms = (time.perf_counter() - start) * 1000
+        wait_until(lambda: window.task_proxy.rowCount() == count)
+        app.processEvents()
+        populate_ms = (time.perf_counter() - start) * 1000
+
+        # 重新加载（例如切换筛选条件后）
+        resets = []
+        window.task_model.modelReset.connect(lambda: resets.append(True))
+        start = time.perf_counter()
+        window.store.invalidate()
+        wait_until(lambda: resets)
+        app.processEvents()
+        reload_ms = (time.perf_counter() - start) * 1000
+
+        # 单任务编辑：从提交修改到列表中对应的行更新完成
+        edit_times = []
+        for i in range(edits):
+            task = window.task_proxy.task_at(i % min(count, 5))
+            progress = (task.progress + 7) % 100
+            start = time.perf_counter()
+            window.async_db.submit('update_task_progress', task.id, progress)
+            wait_until(lambda: window.store.get_task(task.id).progress == progress
+                       and window.task_model.task_at(
+                           window.task_model.row_of(task.id)).progress == progress)
+            app.processEvents()
+            edit_times.append((time.perf_counter() - start) * 1000)
+
+        # 添加与删除单个任务：从提交到列表中出现或消失
+        add_times, delete_times = [], []
+        for i in range(edits):
+            added = []
+            start = time.perf_counter()
+            window.async_db.submit('add_task', {"name": f"新任务 {i}", "priority": "高",
+                                                "deadline": "2025-01-01", "tags": "工作"},
+                                   callback=added.append)
+            wait_until(lambda: added and window.task_model.row_of(added[0]) is not None)
+            app.processEvents()
+            add_times.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            window.async_db.submit('delete_task', added[0])
+            wait_until(lambda: window.task_model.row_of(added[0]) is None)
+            app.processEvents()
+            delete_times.append((time.perf_counter() - start) * 1000)
+
+        result = {
+            "tasks": count,
+            "insert_ms": round(insert_ms, 1),
+            "construct_ms": round(construct_ms, 1),
+            "populate_ms": round(populate_ms, 1),
+            "reload_ms": round(reload_ms, 1),
+            "edit_median_ms": round(statistics.median(edit_times), 2),
+            "edit_max_ms": round(max(edit_times), 2),
+            "add_median_ms": round(statistics.median(add_times), 2),
+            "delete_median_ms": round(statistics.median(delete_times), 2),
+            "widget_count": len(app.allWidgets()),
+            "peak_rss_kb": peak_rss_kb(),
+            "peak_rss_before_window_kb": rss_before_window,
+            "animation_frames": window.animations.frame_stats(),
+        }
+        window.close()
+        db.close()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--output", default="bench_gui.json")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 数据库与界面的提示信息输出到 stderr，stdout 只输出 JSON 结果
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        result = run_worker(args.tasks[0], args.edits)
+        sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    results = []
+    for count in args.tasks:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--tasks", str(count), "--edits", str(args.edits)],
+            env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"{count} tasks: worker failed")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    report = {
+        "benchmark": "bench_gui",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'tasks':>8}{'populate (ms)':>15}{'reload (ms)':>13}{'edit (ms)':>11}"
+          f"{'add (ms)':>10}{'delete (ms)':>13}{'widgets':>9}{'peak RSS (MB)':>15}")
+    for result in results:
+        print(f"{result['tasks']:>8}{result['populate_ms']:>15.1f}{result['reload_ms']:>13.1f}"
+              f"{result['edit_median_ms']:>11.2f}{result['add_median_ms']:>10.2f}"
+              f"{result['delete_median_ms']:>13.2f}{result['widget_count']:>9}"
+              f"{result['peak_rss_kb'] / 1024:>15.1f}")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""任务记录类型的内存与访问开销对比：tuple / dict / sqlite3.Row / Task
+
+用法: python benchmarks/bench_records.py [--rows 100000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import Database
+from models.task import TASK_COLUMNS, task_row_factory
+
+
+def dict_row_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+FACTORIES = [
+    ("tuple", None, lambda row: (row[1], row[2], row[3], row[4])),
+    ("dict", dict_row_factory,
+     lambda row: (row["name"], row["priority"], row["deadline"], row["progress"])),
+    ("sqlite3.Row", sqlite3.Row,
+     lambda row: (row["name"], row["priority"], row["deadline"], row["progress"])),
+    ("Task", task_row_factory,
+     lambda row: (row.name, row.priority, row.deadline, row.progress)),
+]
+
+
+def populate(db, count):
+    with db.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO tasks (name, priority, deadline, progress, tags) VALUES (?, ?, ?, ?, ?)",
+            ((f"任务 {i}", ("高", "中", "低")[i % 3], "2025-01-20", i % 101, "工作")
+             for i in range(count)))
+
+
+def measure(conn, factory, access):
+    cursor = conn.cursor()
+    cursor.row_factory = factory
+    sql = f"SELECT {TASK_COLUMNS} FROM tasks"
+
+    start = time.perf_counter()
+    rows = cursor.execute(sql).fetchall()
+    fetch_time = time.perf_counter() - start
+    del rows
+
+    # tracemalloc 会拖慢分配，内存单独测量
+    tracemalloc.start()
+    rows = cursor.execute(sql).fetchall()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 模拟渲染循环：每行读取名称、优先级、截止日期和进度
+    start = time.perf_counter()
+    for row in rows:
+        access(row)
+    access_time = time.perf_counter() - start
+    return current / len(rows), fetch_time * 1000, access_time * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "records.db"))
+        populate(db, args.rows)
+        conn = db._get_connection()
+        print(f"{args.rows} rows")
+        print(f"{'type':<14}{'bytes/row':>12}{'fetch (ms)':>14}{'access (ms)':>14}")
+        for name, factory, access in FACTORIES:
+            per_row, fetch_ms, access_ms = measure(conn, factory, access)
+            print(f"{name:<14}{per_row:>12.0f}{fetch_ms:>14.1f}{access_ms:>14.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
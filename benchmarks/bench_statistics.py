@@ -0,0 +1,110 @@
+"""时间序列统计：扫描任务表聚合 vs 每日汇总表 + NumPy 向量化聚合
+
+用法: python benchmarks/bench_statistics.py [--tasks 100000] [--days 365] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import Database, epoch_day
+from models.time_series import expand_rollups, aggregate, summarize
+
+
+def populate(db, count, days, today):
+    """生成 count 个任务，创建与完成时间分布在最近 days 天内，约七成已完成"""
+    rng = random.Random(0)
+    first = datetime.combine(today - timedelta(days=days), datetime.min.time())
+
+    def rows():
+        for i in range(count):
+            created = first + timedelta(seconds=rng.randrange(days * 86400))
+            deadline = (created + timedelta(days=rng.randrange(1, 30))).date()
+            completed = None
+            if rng.random() < 0.7:
+                completed = created + timedelta(seconds=rng.randrange(1, 40 * 86400))
+                if completed.date() > today:
+                    completed = None
+            yield (f"任务 {i}", ("高", "中", "低")[i % 3], deadline.isoformat(),
+                   100 if completed else 0,
+                   created.strftime("%Y-%m-%d %H:%M:%S"),
+                   completed.strftime("%Y-%m-%d %H:%M:%S") if completed else None)
+
+    with db.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO tasks (name, priority, deadline, progress, created_at, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows())
+
+
+def scan_weekly(conn, start_day, end_day, today_day):
+    """改动前的做法：每次都扫描任务表按周分组"""
+    completed_day = "CAST(julianday(completed_at, 'localtime') - 2440587.5 AS INTEGER)"
+    completions = conn.execute(f"""
+    SELECT {completed_day} - ({completed_day} - 4) % 7 AS week, COUNT(*),
+           AVG(julianday(completed_at) - julianday(created_at))
+    FROM tasks WHERE completed_at IS NOT NULL AND {completed_day} BETWEEN ? AND ?
+    GROUP BY week
+    """, (start_day, end_day)).fetchall()
+    overdue = conn.execute(f"""
+    SELECT deadline_day - (deadline_day - 4) % 7 AS week, COUNT(*)
+    FROM tasks
+    WHERE deadline_day BETWEEN ? AND ? AND deadline_day < ?
+      AND (completed_at IS NULL OR {completed_day} > deadline_day)
+    GROUP BY week
+    """, (start_day, end_day, today_day)).fetchall()
+    return completions, overdue
+
+
+def rollup_series(db, start_day, end_day, today):
+    rollups = expand_rollups(db.get_daily_rollups(start_day, end_day), start_day, end_day)
+    return (aggregate(rollups, "week", today), aggregate(rollups, "month", today),
+            summarize(rollups, today))
+
+
+def measure(func, repeat):
+    """返回每次调用的平均耗时（毫秒）"""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    today = date.today()
+    end_day = epoch_day(today)
+    start_day = end_day - args.days + 1
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "statistics.db"))
+        start = time.perf_counter()
+        populate(db, args.tasks, args.days, today)
+        insert_ms = (time.perf_counter() - start) * 1000
+        conn = db._get_connection()
+
+        scan_ms = measure(lambda: scan_weekly(conn, start_day, end_day, end_day), args.repeat)
+        rollup_ms = measure(lambda: rollup_series(db, start_day, end_day, today), args.repeat)
+        weekly, monthly, summary = rollup_series(db, start_day, end_day, today)
+        db.close()
+
+    print(f"{args.tasks} tasks over {args.days} days (insert with rollup triggers: {insert_ms:.0f} ms)")
+    print(f"{'method':<36}{'ms':>10}")
+    print(f"{'scan tasks, weekly only':<36}{scan_ms:>10.2f}")
+    print(f"{'rollups + numpy, weekly+monthly':<36}{rollup_ms:>10.2f}")
+    print(f"completed {summary['completed']}, overdue {summary['overdue']}, "
+          f"average {summary['average_days']:.2f} days, "
+          f"{len(weekly.starts)} weeks, {len(monthly.starts)} months")
+
+
+if __name__ == "__main__":
+    main()
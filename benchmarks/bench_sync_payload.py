@@ -0,0 +1,117 @@
+"""同步数据格式对比：整库 JSON（字段名重复） / 行格式 JSON（格式 1） / gzip 行格式（格式 2）
+
+比较编码后的大小、编码与解码耗时，以及解码时的内存峰值（tracemalloc）。
+格式 2 使用流式解码，逐小批产生记录而不保留全部对象。
+
+用法: python benchmarks/bench_sync_payload.py [--tasks 10000 100000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import SYNC_RECORD_FIELDS, SYNC_SUBTASK_FIELDS
+from sync.delta import encode_batch, decode_batch, read_batch, iter_chunks
+
+DEVICE = "0" * 32
+
+
+def make_records(count):
+    """生成 count 个同步记录，约一半带 1-3 个子任务"""
+    rng = random.Random(0)
+    records = []
+    for i in range(count):
+        created = f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 09:{i % 60:02d}:00"
+        progress = rng.choice((0, 0, 30, 60, 100))
+        subtasks = [(f"子任务 {j}", rng.choice(("pending", "completed")), rng.randrange(10, 120), 0)
+                    for j in range(rng.choice((0, 0, 1, 2, 3)))]
+        records.append((f"{i:032x}", f"任务 {i}", ("高", "中", "低")[i % 3],
+                        f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                        progress, ("工作", "学习", "个人")[i % 3], created,
+                        created if progress == 100 else None, created + ".000", subtasks))
+    return records
+
+
+def encode_export(records):
+    """改动前的做法：每个任务一个带字段名的对象，json.dump 后整体上传"""
+    tasks = []
+    for record in records:
+        task = dict(zip(SYNC_RECORD_FIELDS, record))
+        task["subtasks"] = [dict(zip(SYNC_SUBTASK_FIELDS, subtask)) for subtask in record[-1]]
+        tasks.append(task)
+    return json.dumps({"tasks": tasks}).encode("utf-8")
+
+
+def decode_export(data):
+    return json.loads(data)["tasks"]
+
+
+def encode_rows(records):
+    """格式 1：字段名只出现一次，任务为数组，不压缩"""
+    payload = {"format": 1, "device": DEVICE, "batch": 1,
+               "fields": list(SYNC_RECORD_FIELDS), "subtask_fields": list(SYNC_SUBTASK_FIELDS),
+               "upserts": records, "deletes": []}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_stream(data):
+    """格式 2 流式解码：每批记录处理完即丢弃"""
+    header, batches = read_batch(iter_chunks(data))
+    count = 0
+    for upserts, deletes in batches:
+        count += len(upserts) + len(deletes)
+    return count
+
+
+FORMATS = [
+    ("json export", encode_export, decode_export),
+    ("rows (format 1)", encode_rows, lambda data: decode_batch(data)[0]),
+    ("gzip rows (format 2)", lambda records: encode_batch(DEVICE, 1, records, []), decode_stream),
+]
+
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def decode_peak(decode, data):
+    tracemalloc.start()
+    decode(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for count in args.tasks:
+        records = make_records(count)
+        print(f"{count} tasks")
+        print(f"{'format':<22}{'size (KB)':>11}{'encode (ms)':>13}{'decode (ms)':>13}"
+              f"{'decode peak (MB)':>18}")
+        for name, encode, decode in FORMATS:
+            encode_ms, data = best_of(lambda: encode(records), args.repeat)
+            decode_ms, _ = best_of(lambda: decode(data), args.repeat)
+            peak = decode_peak(decode, data)
+            print(f"{name:<22}{len(data) / 1024:>11.0f}{encode_ms:>13.1f}{decode_ms:>13.1f}"
+                  f"{peak / 1024 / 1024:>18.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
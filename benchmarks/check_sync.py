@@ -0,0 +1,283 @@
+"""用内存中的 WebDAV 服务器（fake_webdav.py）检查同步的请求数与行为
+
+- 增量同步：两台设备互相同步后数据一致；没有修改时一次同步只有一个 PROPFIND
+- 三台设备：无论以什么顺序应用批次，较新的修改总是保留下来，较旧的修改不会让
+  已删除的任务重新出现，最终各设备数据一致；批次编号文件上传失败后下次同步会重写
+- 文件同步：内容未变化的文件不重复上传，远程未变化时下载只得到 304；
+  远程被其他设备修改后，带 If-Match 的上传被拒绝
+- 后台同步：短时间内的多次修改合并为一次同步；同步进行中的删除在本次结束后
+  再同步一次；取消后在下一个批次前停止，
+  已上传的批次保持有效；同步进行中关闭时很快退出
+
+任一检查失败时以非零状态退出。在临时目录中运行，不会写入仓库中的文件。
+
+用法: python benchmarks/check_sync.py [--tasks 1200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+
+from fake_webdav import FakeServer
+from gui.background_sync import BackgroundSync, CANCELLED, SHUTDOWN_TIMEOUT_MS
+from models.database import Database
+from models.task_store import TaskStore
+from sync.delta import HEADS_DIR
+from sync.webdav_sync import WebDAVSync
+
+# 检查后台同步时使用的延迟（毫秒）
+DEBOUNCE_MS = 100
+
+failures = []
+
+
+def check(name, condition, detail=''):
+    print(f"{'ok' if condition else 'FAIL':<6}{name}{f'  ({detail})' if detail else ''}")
+    if not condition:
+        failures.append(name)
+
+
+def make_device(server, path, device=None):
+    db = Database(path)
+    if device is not None:
+        # 固定设备标识，决定拉取批次的顺序（按设备标识排序）
+        db.set_sync_state('device', device)
+    sync = WebDAVSync(db)
+    sync.client = server.client()
+    sync.connected = True
+    return db, sync
+
+
+def check_delta_sync(server, task_count):
+    a, sync_a = make_device(server, 'a.db')
+    b, sync_b = make_device(server, 'b.db')
+    a.add_tasks({"name": f"任务 {i}", "priority": "高", "deadline": "2025-01-01"}
+                for i in range(task_count))
+    check("initial sync", sync_a.sync_tasks() and sync_b.sync_tasks())
+    check("devices converge", b.get_task_statistics()['total'] == task_count,
+          f"{b.get_task_statistics()['total']} of {task_count} tasks on device b")
+
+    for name, sync in (("a", sync_a), ("b", sync_b)):
+        server.requests.clear()
+        sync.sync_tasks()
+        check(f"idle sync on device {name} is one PROPFIND", server.requests == [
+            ('list', '/tasks/heads/')], f"requests: {server.requests}")
+
+    task = next(a.iter_tasks())
+    a.update_task_progress(task.id, 30)
+    server.requests.clear()
+    sync_a.sync_tasks()
+    check("one edit uploads one batch", server.count('upload') == 2,
+          f"{server.count('upload')} uploads (batch + head)")
+    sync_b.sync_tasks()
+    check("edit reaches the other device", b.get_task_statistics()['in_progress'] == 1)
+
+    # 批次已上传，但批次编号文件上传失败：其他设备看不到这一批
+    a.update_task_progress(task.id, 50)
+    server.fail_once.add(HEADS_DIR + a.get_sync_device())
+    check("failed head upload fails the sync", not sync_a.sync_tasks())
+    server.requests.clear()
+    sync_a.sync_tasks()
+    check("next sync rewrites the head", server.count('upload') == 1,
+          f"{server.count('upload')} uploads")
+    sync_b.sync_tasks()
+    check("batch behind a failed head reaches the other device",
+          find_task(b, task.name).progress == 50)
+
+
+def snapshot(db):
+    return sorted(db.iter_export_tasks(), key=lambda task: task['id'])
+
+
+def find_task(db, name):
+    return next((task for task in db.iter_tasks() if task.name == name), None)
+
+
+def check_three_devices():
+    server = FakeServer()
+    # 设备标识决定拉取顺序：C 先应用 B 的批次，再应用 A 的批次
+    devices = {name: make_device(server, f'three-{name}.db', device)
+               for name, device in (('a', 'zzz-a'), ('b', 'aaa-b'), ('c', 'mmm-c'))}
+    (a, sync_a), (b, sync_b), (c, sync_c) = devices.values()
+    a.add_tasks({"name": f"任务 {i}", "priority": "高", "deadline": "2025-01-01"}
+                for i in range(2))
+    for sync in (sync_a, sync_b, sync_c):
+        sync.sync_tasks()
+
+    # A 先修改并上传，B 随后做出较新的修改
+    a.update_task_progress(find_task(a, "任务 0").id, 30)
+    sync_a.sync_tasks()
+    time.sleep(0.01)
+    b.update_task_progress(find_task(b, "任务 0").id, 60)
+    for sync in (sync_b, sync_a, sync_c):
+        sync.sync_tasks()
+    progress = {name: find_task(db, "任务 0").progress for name, (db, _) in devices.items()}
+    check("newer edit wins on every device", set(progress.values()) == {60}, f"{progress}")
+
+    # B 的修改较早，但在 A 删除该任务、C 应用删除之后才上传
+    b.update_task_progress(find_task(b, "任务 1").id, 10)
+    sync_b.pull_changes()
+    time.sleep(0.01)
+    a.delete_task(find_task(a, "任务 1").id)
+    sync_a.sync_tasks()
+    sync_c.sync_tasks()
+    sync_b.push_changes()
+    for sync in (sync_c, sync_a, sync_b):
+        sync.sync_tasks()
+    totals = {name: db.get_task_statistics()['total'] for name, (db, _) in devices.items()}
+    check("older edit does not bring back a deleted task", set(totals.values()) == {1},
+          f"tasks per device: {totals}")
+    check("three devices converge", snapshot(a) == snapshot(b) == snapshot(c))
+
+
+def check_file_sync(server):
+    _, sync_a = make_device(server, 'fa.db')
+    _, sync_b = make_device(server, 'fb.db')
+    with open('a.json', 'w') as f:
+        f.write('{"x": 1}')
+
+    sync_a.sync_to_cloud('a.json')
+    os.utime('a.json')
+    server.requests.clear()
+    check("unchanged file is not uploaded again",
+          sync_a.sync_to_cloud('a.json') and server.requests == [],
+          f"requests: {server.requests}")
+
+    sync_b.sync_from_cloud('a.json', 'b.json')
+    server.requests.clear()
+    sync_b.sync_from_cloud('a.json', 'b.json')
+    check("unchanged remote file costs one 304",
+          server.requests == [('download', '/tasks/a.json')], f"requests: {server.requests}")
+
+    # 其他设备修改了远程文件之后，本地修改的上传条件不再成立
+    server.files['/tasks/a.json'] = b'{"x": 2}'
+    with open('a.json', 'w') as f:
+        f.write('{"x": 3}')
+    check("stale conditional upload is rejected", not sync_a.sync_to_cloud('a.json')
+          and server.files['/tasks/a.json'] == b'{"x": 2}')
+
+
+def wait_until(app, condition, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("等待后台同步超时")
+        app.processEvents()
+
+
+def wait_for(app, seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents()
+
+
+def check_background_sync(app, server):
+    store = TaskStore(Database('bg.db'))
+    sync = WebDAVSync(store)
+    sync.client = server.client()
+    sync.connected = True
+    background = BackgroundSync(sync, debounce_ms=DEBOUNCE_MS)
+    events = []
+    background.started.connect(lambda: events.append('started'))
+    background.progress.connect(events.append)
+    background.finished.connect(lambda status: events.append(('finished', status)))
+    # 与 MainWindow 相同：本地写入的任务处于待同步状态时安排延迟同步
+    for signal in (store.task_added, store.task_updated):
+        signal.connect(lambda task: task.sync_status == 'pending' and background.schedule())
+    store.task_removed.connect(lambda task_id: background.schedule())
+
+    for i in range(5):
+        store.add_task({"name": f"新任务 {i}", "priority": "高", "deadline": "2025-01-01"})
+        wait_for(app, DEBOUNCE_MS / 5000)
+    wait_until(app, lambda: ('finished', 'synced') in events)
+    wait_for(app, DEBOUNCE_MS * 3 / 1000)
+    check("five quick edits cause one sync", events.count('started') == 1,
+          f"{events.count('started')} syncs")
+
+    # 同步进行中删除一个已同步的任务
+    server.latency = 0.05
+    events.clear()
+    background.sync_now()
+    wait_until(app, lambda: background.running)
+    store.delete_task(next(store.iter_tasks()).id)
+    wait_until(app, lambda: ('finished', 'synced') in events)
+    wait_for(app, DEBOUNCE_MS * 3 / 1000)
+    wait_until(app, lambda: not background.running)
+    server.latency = 0
+    unsent = store.db._get_connection().execute(
+        'SELECT COUNT(*) FROM sync_tombstones WHERE origin IS NULL').fetchone()[0]
+    check("delete during a sync is uploaded by a follow-up sync",
+          events.count('started') == 2 and unsent == 0,
+          f"{events.count('started')} syncs, {unsent} deletes not uploaded")
+
+    # 较慢的网络上分多批上传，上传第二批时取消
+    server.latency = 0.05
+    store.db.add_tasks({"name": f"任务 {i}", "priority": "中", "deadline": "2025-01-01"}
+                       for i in range(5000))
+    events.clear()
+    background.sync_now()
+    wait_until(app, lambda: any(isinstance(event, str) and event.endswith(' 2 批')
+                                for event in events))
+    background.cancel()
+    wait_until(app, lambda: not background.running)
+    pending = store.get_task_statistics()['pending_sync']
+    check("cancel stops before the next batch",
+          ('finished', CANCELLED) in events and 0 < pending < 5000,
+          f"{5000 - pending} of 5000 tasks uploaded")
+
+    # 同步进行中关闭
+    background.sync_now()
+    wait_until(app, lambda: background.running)
+    start = time.perf_counter()
+    background.shutdown()
+    elapsed = time.perf_counter() - start
+    check("shutdown during a sync returns promptly", elapsed < 1, f"{elapsed:.2f} s")
+    check("no sync after shutdown", not background.sync_now())
+
+    # 单个请求比关闭等待的时间还长：不等请求结束
+    server.latency = SHUTDOWN_TIMEOUT_MS / 1000 * 2
+    background = BackgroundSync(sync, debounce_ms=DEBOUNCE_MS)
+    store.add_task({"name": "慢速上传", "priority": "高", "deadline": "2025-01-01"})
+    background.sync_now()
+    wait_until(app, lambda: background.running)
+    start = time.perf_counter()
+    background.shutdown()
+    elapsed = time.perf_counter() - start
+    check("shutdown does not wait for a slow request",
+          elapsed < SHUTDOWN_TIMEOUT_MS / 1000 + 0.5, f"{elapsed:.2f} s")
+    # 分离的同步线程在请求结束后自行退出
+    wait_for(app, server.latency * 2)
+    server.latency = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1200)
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv[:1])
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # WebDAVSync 把日志与配置写在当前目录
+        os.chdir(tmp)
+        try:
+            server = FakeServer()
+            check_delta_sync(server, args.tasks)
+            check_three_devices()
+            check_file_sync(server)
+            check_background_sync(app, server)
+        finally:
+            os.chdir(cwd)
+
+    if failures:
+        raise SystemExit(f"{len(failures)} check(s) failed")
+    print("all checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""内存中的 WebDAV 服务器，用于在没有真实服务器时检查同步逻辑
+
+FakeClient 实现 WebDAVSync 用到的 webdav3 Client 接口（check、mkdir、get_full_path、
+execute_request），支持 ETag、If-Match / If-None-Match 条件请求与 PROPFIND。
+服务器记录收到的每个请求，检查脚本据此断言请求次数。
+"""
+import email.utils
+import hashlib
+import time
+from urllib.parse import unquote
+
+from webdav3.exceptions import RemoteResourceNotFound, ResponseErrorCode
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeServer:
+    """保存文件内容与目录；requests 按顺序记录 (动作, 路径)"""
+
+    hostname = 'http://fake'
+
+    def __init__(self, etags=True):
+        self.files = {}
+        self.mtimes = {}
+        self.dirs = {'/'}
+        self.requests = []
+        self.etags = etags
+        # 为 0 以外的值时，每个请求先等待这么多秒，模拟较慢的网络
+        self.latency = 0
+        # 下一次上传到这些路径时返回 503，随后从集合中移除
+        self.fail_once = set()
+
+    def client(self):
+        return FakeClient(self)
+
+    def etag(self, path):
+        if not self.etags:
+            return None
+        return '"%s"' % hashlib.md5(self.files[path]).hexdigest()
+
+    def count(self, action):
+        return sum(1 for request in self.requests if request[0] == action)
+
+
+class FakeClient:
+    def __init__(self, server):
+        self.server = server
+        self.webdav = server
+
+    def get_full_path(self, urn):
+        return urn.path()
+
+    def check(self, path):
+        self.server.requests.append(('check', path))
+        return path.rstrip('/') + '/' in self.server.dirs or path in self.server.files
+
+    def mkdir(self, path, recursive=False):
+        self.server.requests.append(('mkdir', path))
+        parts = path.strip('/').split('/')
+        for i in range(1, len(parts) + 1):
+            self.server.dirs.add('/' + '/'.join(parts[:i]) + '/')
+
+    def execute_request(self, action, path, data=None, headers_ext=None):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        path = unquote(path)
+        headers = dict(header.split(': ', 1) for header in headers_ext or [])
+        server.requests.append((action, path))
+
+        if action == 'download':
+            if path not in server.files:
+                raise RemoteResourceNotFound(path)
+            etag = server.etag(path)
+            if etag is not None and headers.get('If-None-Match') == etag:
+                return FakeResponse(304)
+            return FakeResponse(200, server.files[path], self._etag_header(path))
+
+        if action == 'upload':
+            if path in server.fail_once:
+                server.fail_once.discard(path)
+                raise ResponseErrorCode(path, 503, b'')
+            if path.rsplit('/', 1)[0] + '/' not in server.dirs:
+                raise ResponseErrorCode(path, 409, b'')
+            if 'If-Match' in headers and (path not in server.files
+                                          or headers['If-Match'] != server.etag(path)):
+                raise ResponseErrorCode(path, 412, b'')
+            if hasattr(data, 'read'):
+                data = data.read()
+            server.files[path] = bytes(data)
+            server.mtimes[path] = time.time()
+            return FakeResponse(201, b'', self._etag_header(path))
+
+        if action == 'list':
+            if path not in server.dirs:
+                raise RemoteResourceNotFound(path)
+            body = self._propfind_entry(path, True) + ''.join(
+                self._propfind_entry(name, False) for name in server.files
+                if name.rsplit('/', 1)[0] + '/' == path)
+            return FakeResponse(207, self._multistatus(body))
+
+        if action == 'info':
+            if path not in server.files:
+                raise RemoteResourceNotFound(path)
+            return FakeResponse(207, self._multistatus(self._propfind_entry(path, False)))
+
+        raise ValueError(f"不支持的请求: {action}")
+
+    def _etag_header(self, path):
+        etag = self.server.etag(path)
+        return {'ETag': etag} if etag else {}
+
+    def _propfind_entry(self, path, is_dir):
+        props = '<d:resourcetype><d:collection/></d:resourcetype>' if is_dir else ''
+        if not is_dir and self.server.etags:
+            props += f'<d:getetag>{self.server.etag(path)}</d:getetag>'
+        modified = email.utils.formatdate(self.server.mtimes.get(path, 0), usegmt=True)
+        props += f'<d:getlastmodified>{modified}</d:getlastmodified>'
+        return (f'<d:response><d:href>{path}</d:href>'
+                f'<d:propstat><d:prop>{props}</d:prop></d:propstat></d:response>')
+
+    @staticmethod
+    def _multistatus(body):
+        return f'<d:multistatus xmlns:d="DAV:">{body}</d:multistatus>'.encode()
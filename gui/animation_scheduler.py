@@ -0,0 +1,166 @@
+from collections import deque
+import time
+
+from PyQt6.QtCore import QObject, QTimer, QEasingCurve, pyqtSignal, Qt
+
+# 以 60 帧为目标，单帧超过两倍间隔视为超出预算
+FRAME_INTERVAL_MS = 16
+FRAME_BUDGET_MS = 33
+# 连续多少帧超出预算后放弃所有进行中的动画
+OVER_BUDGET_FRAMES = 3
+# 同时运行的动画数量上限
+MAX_ACTIVE_ANIMATIONS = 32
+# 帧时间统计保留的帧数
+FRAME_HISTORY = 240
+
+
+class _Animation:
+    __slots__ = ('start', 'end', 'duration', 'curve', 'setter', 'finished', 'started_at')
+
+    def __init__(self, start, end, duration, curve, setter, finished, started_at):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.curve = curve
+        self.setter = setter
+        self.finished = finished
+        self.started_at = started_at
+
+    def value_at(self, now):
+        progress = min((now - self.started_at) * 1000 / self.duration, 1.0)
+        return self.start + (self.end - self.start) * self.curve.valueForProgress(progress), progress >= 1.0
+
+
+class AnimationScheduler(QObject):
+    """界面动画的统一调度器
+
+    所有动画共用一个定时器，每帧依次计算数值并调用各自的 setter，
+    最后发出一次 frame 信号，由调用方合并重绘。
+    同时运行的动画数量有上限，超出上限的请求直接跳到终值；
+    连续几帧超出时间预算时放弃全部进行中的动画，保证事件循环不被拖慢。
+    """
+
+    # 每帧所有 setter 调用完成后发出
+    frame = pyqtSignal()
+
+    def __init__(self, parent=None, max_active=MAX_ACTIVE_ANIMATIONS,
+                 frame_budget_ms=FRAME_BUDGET_MS):
+        super().__init__(parent)
+        self.max_active = max_active
+        self.frame_budget_ms = frame_budget_ms
+        self._animations = {}
+        self._curves = {}
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self._tick)
+        self._last_frame = None
+        self._over_budget_run = 0
+        self._frame_times = deque(maxlen=FRAME_HISTORY)
+        self._frames = 0
+        self._over_budget = 0
+        self._dropped = 0
+
+    def animate(self, key, start, end, duration, setter,
+                easing=QEasingCurve.Type.OutCubic, finished=None):
+        """从 start 到 end 以 duration 毫秒播放一个数值动画，返回是否真正播放
+
+        相同 key 的动画会被新动画取代。达到并发上限或当前帧率过低时
+        不播放，直接把终值交给 setter。
+        """
+        self._animations.pop(key, None)
+        overloaded = self._timer.isActive() and self._over_budget_run >= OVER_BUDGET_FRAMES
+        if duration <= 0 or len(self._animations) >= self.max_active or overloaded:
+            self._dropped += 1
+            self._finish(setter, end, finished)
+            self.frame.emit()
+            return False
+        curve = self._curves.get(easing)
+        if curve is None:
+            curve = self._curves[easing] = QEasingCurve(easing)
+        self._animations[key] = _Animation(start, end, duration, curve, setter,
+                                           finished, time.perf_counter())
+        setter(start)
+        if not self._timer.isActive():
+            self._last_frame = None
+            self._over_budget_run = 0
+            self._timer.start()
+        return True
+
+    def is_running(self, key):
+        return key in self._animations
+
+    def stop(self, key, jump_to_end=True):
+        """停止某个动画，默认把终值交给 setter"""
+        animation = self._animations.pop(key, None)
+        if animation is not None and jump_to_end:
+            self._finish(animation.setter, animation.end, animation.finished)
+            self.frame.emit()
+
+    def stop_all(self, jump_to_end=True):
+        """停止全部动画"""
+        animations, self._animations = self._animations, {}
+        self._timer.stop()
+        if jump_to_end and animations:
+            for animation in animations.values():
+                self._finish(animation.setter, animation.end, animation.finished)
+            self.frame.emit()
+
+    @staticmethod
+    def _finish(setter, end, finished):
+        setter(end)
+        if finished is not None:
+            finished()
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self._record_frame((now - self._last_frame) * 1000)
+        self._last_frame = now
+
+        if self._over_budget_run >= OVER_BUDGET_FRAMES:
+            # 帧率已经跟不上，直接结束所有动画
+            self._dropped += len(self._animations)
+            self.stop_all()
+            return
+
+        done = []
+        for key, animation in self._animations.items():
+            value, complete = animation.value_at(now)
+            animation.setter(value)
+            if complete:
+                done.append(key)
+        for key in done:
+            animation = self._animations.pop(key)
+            if animation.finished is not None:
+                animation.finished()
+        if not self._animations:
+            self._timer.stop()
+        self.frame.emit()
+
+    def _record_frame(self, frame_ms):
+        self._frames += 1
+        self._frame_times.append(frame_ms)
+        if frame_ms > self.frame_budget_ms:
+            self._over_budget += 1
+            self._over_budget_run += 1
+        else:
+            self._over_budget_run = 0
+
+    def frame_stats(self):
+        """返回最近若干帧的帧时间统计（毫秒）"""
+        times = sorted(self._frame_times)
+        stats = {
+            'frames': self._frames,
+            'over_budget': self._over_budget,
+            'dropped': self._dropped,
+            'active': len(self._animations),
+            'mean_ms': 0.0,
+            'p95_ms': 0.0,
+            'max_ms': 0.0,
+        }
+        if times:
+            stats['mean_ms'] = sum(times) / len(times)
+            stats['p95_ms'] = times[min(len(times) - 1, int(len(times) * 0.95))]
+            stats['max_ms'] = times[-1]
+        return stats
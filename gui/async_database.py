@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class DatabaseRequest:
+    """一次后台数据库调用，可通过 cancel() 取消"""
+
+    def __init__(self, key, callback, error_callback):
+        self.key = key
+        self.callback = callback
+        self.error_callback = error_callback
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """取消请求：尚未开始的不再执行，正在执行的结果会被丢弃"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class AsyncDatabase(QObject):
+    """Database 的异步外观，查询在后台线程池中执行，不阻塞 Qt 事件循环
+
+    结果通过信号回到 GUI 线程后再调用 callback。提交时指定相同 key 的请求
+    会相互合并：新请求会取消仍在排队或执行中的旧请求，只有最新一次的
+    结果会被送达（例如连续多次刷新任务列表时只处理最后一次）。
+    不带 key 的请求（写操作）由单独的一个线程按提交顺序依次执行，
+    对同一任务先后提交的修改不会以相反的顺序提交。
+    """
+
+    # 后台线程通过该信号把结果交给 GUI 线程（跨线程信号自动排队）
+    _finished = pyqtSignal(object, object, object)
+
+    def __init__(self, db, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.db = db
+        # Database 为每个线程维护独立连接，线程池中的线程会复用各自的连接
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='database')
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='database-write')
+        self._latest = {}
+        self._closed = False
+        self._finished.connect(self._deliver)
+
+    def submit(self, method, *args, key=None, callback=None, error_callback=None, **kwargs):
+        """在后台执行 Database 方法（方法名或可调用对象），返回 DatabaseRequest"""
+        func = getattr(self.db, method) if isinstance(method, str) else method
+        return self._submit(key, callback, error_callback,
+                            lambda: func(*args, **kwargs))
+
+    def _submit(self, key, callback, error_callback, job):
+        request = DatabaseRequest(key, callback, error_callback)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = request
+            executor = self._executor
+        else:
+            executor = self._writer
+        request.future = executor.submit(self._run, request, job)
+        return request
+
+    def _run(self, request, job):
+        if request.cancelled:
+            return
+        try:
+            result, error = job(), None
+        except Exception as e:
+            result, error = None, e
+        if not request.cancelled:
+            self._finished.emit(request, result, error)
+
+    def _deliver(self, request, result, error):
+        if request.key is not None and self._latest.get(request.key) is request:
+            del self._latest[request.key]
+        if request.cancelled or self._closed:
+            return
+        if error is not None:
+            if request.error_callback is not None:
+                request.error_callback(error)
+            else:
+                print(f"后台数据库操作错误: {str(error)}")
+        elif request.callback is not None:
+            request.callback(result)
+
+    def cancel_all(self):
+        """取消所有带 key 的未完成请求"""
+        for request in list(self._latest.values()):
+            request.cancel()
+        self._latest.clear()
+
+    def shutdown(self):
+        """取消可合并的读取请求，等待已提交的写入完成后退出后台线程"""
+        self._closed = True
+        self.cancel_all()
+        # 不带 key 的请求（添加、删除、记录番茄钟等写操作）仍会执行完，避免丢失数据
+        self._executor.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
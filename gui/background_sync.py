@@ -0,0 +1,166 @@
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+# 本地修改后等待多久才开始同步（毫秒），期间的连续修改合并为一次同步
+SYNC_DEBOUNCE_MS = 5000
+
+# 关闭时最多等待同步线程多久（毫秒），超时则不再等待进行中的网络请求
+SHUTDOWN_TIMEOUT_MS = 1000
+
+# 关闭时未能及时退出的同步线程与其 worker，保持引用直到线程结束，
+# 避免 QThread 在运行中随父对象一起被销毁
+_detached = []
+
+# finished 信号携带的同步结果
+SYNCED = 'synced'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class _SyncWorker(QObject):
+    """在同步线程中执行 WebDAVSync 的网络操作"""
+
+    connected = pyqtSignal(bool)
+    finished = pyqtSignal(str)
+
+    def __init__(self, sync):
+        super().__init__()
+        self.sync = sync
+
+    def load_config(self):
+        self.connected.emit(self.sync.load_config())
+
+    def run(self):
+        if self.sync.sync_tasks():
+            self.finished.emit(SYNCED)
+        else:
+            self.finished.emit(CANCELLED if self.sync.cancel_event.is_set() else FAILED)
+
+
+class BackgroundSync(QObject):
+    """在独立线程中执行增量同步，不阻塞 Qt 事件循环
+
+    同步由四种方式触发：sync_now（手动）、schedule（本地修改后延迟触发）、
+    load_config 连接成功后，以及每隔 sync.sync_interval 秒的定期同步。同一时间只有一次同步在进行，
+    进行中再次请求时会在本次结束后再同步一次。
+    状态通过 started / progress / finished 信号在 GUI 线程中送达。
+    """
+
+    connected = pyqtSignal(bool)
+    started = pyqtSignal()
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    # GUI 线程通过这些信号让同步线程开始工作（跨线程信号自动排队）
+    _run = pyqtSignal()
+    _load_config = pyqtSignal()
+
+    def __init__(self, sync, parent=None, debounce_ms=SYNC_DEBOUNCE_MS):
+        super().__init__(parent)
+        self.sync = sync
+        self._running = False
+        self._again = False
+        self._closed = False
+
+        self._thread = QThread(self)
+        self._thread.setObjectName('webdav-sync')
+        self._worker = _SyncWorker(sync)
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._run.connect(self._worker.run)
+        self._load_config.connect(self._worker.load_config)
+        self._worker.connected.connect(self._on_connected)
+        self._worker.finished.connect(self._on_finished)
+        sync.progress.connect(self.progress)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.sync_now)
+        # 定期同步从上一次同步结束时开始计时
+        self._periodic = QTimer(self)
+        self._periodic.setSingleShot(True)
+        self._periodic.setInterval(sync.sync_interval * 1000)
+        self._periodic.timeout.connect(self.sync_now)
+
+        self._thread.start()
+        self._periodic.start()
+
+    @property
+    def running(self):
+        return self._running
+
+    def load_config(self):
+        """在同步线程中读取保存的配置并连接服务器（需要网络请求），结果由 connected 信号送达"""
+        if not self._closed:
+            self._load_config.emit()
+
+    def _on_connected(self, connected):
+        if self._closed:
+            return
+        self.connected.emit(connected)
+        if connected:
+            # 连接后立即同步一次，取回离线期间其他设备的修改
+            self.sync_now()
+
+    def schedule(self):
+        """本地修改后调用：重新开始计时，debounce_ms 内没有新的修改时才同步"""
+        if not self._closed:
+            self._debounce.start()
+
+    def sync_now(self):
+        """立即开始同步，返回是否已安排；未连接服务器或已关闭时不同步"""
+        self._debounce.stop()
+        if self._closed:
+            return False
+        if not self.sync.connected:
+            # 未连接时定期计时继续，连接后由计时器或 load_config 触发同步
+            self._periodic.start()
+            return False
+        if self._running:
+            self._again = True
+            return True
+        self._running = True
+        self._periodic.stop()
+        # 在同步线程开始之前清除取消标记，之后的 cancel() 都作用于这一次同步
+        self.sync.cancel_event.clear()
+        self.started.emit()
+        self._run.emit()
+        return True
+
+    def cancel(self):
+        """取消进行中的同步与尚未开始的延迟同步
+
+        同步在下一个批次开始前停止，已应用或已上传的批次保持有效。
+        """
+        self._debounce.stop()
+        self._again = False
+        if self._running:
+            self.sync.cancel_event.set()
+
+    def _on_finished(self, status):
+        self._running = False
+        if self._closed:
+            return
+        self._periodic.start()
+        self.finished.emit(status)
+        if self._again:
+            self._again = False
+            self.sync_now()
+
+    def shutdown(self):
+        """停止所有计时器并取消进行中的同步，最多等待 SHUTDOWN_TIMEOUT_MS 让同步线程退出
+
+        取消只在批次之间生效，正在进行的网络请求可能要到超时才返回；
+        等待超时后同步线程与父对象分离，在请求结束后自行退出，不阻塞 GUI。
+        进程先退出时请求被中断，尚未确认的本地修改仍标记为待同步，下次启动后会继续上传。
+        """
+        self._closed = True
+        self._debounce.stop()
+        self._periodic.stop()
+        self.cancel()
+        self._thread.quit()
+        if self._thread.wait(SHUTDOWN_TIMEOUT_MS):
+            return
+        detached = (self._thread, self._worker)
+        self._thread.setParent(None)
+        _detached.append(detached)
+        self._thread.finished.connect(lambda: _detached.remove(detached))
@@ -1,20 +1,54 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
-                           QPushButton, QListWidget, QLabel, QListWidgetItem, 
-                           QHBoxLayout, QMessageBox, QMenu, QProgressBar)
-from PyQt6.QtCore import Qt, QPropertyAnimation, QSize, QTimer, QEasingCurve, QPoint
+                           QPushButton, QLabel, QAbstractItemView,
+                           QHBoxLayout, QMessageBox, QMenu, QComboBox, QLineEdit)
+from PyQt6.QtCore import Qt, QSize, QPoint, QEasingCurve, QTimer
 from PyQt6.QtGui import QIcon, QPixmap
-from .task_dialog import TaskDialog
-from .statistics_dialog import StatisticsDialog
-from .pomodoro import PomodoroDialog
-from sync.webdav_sync import WebDAVSync
+from .async_database import AsyncDatabase
+from .animation_scheduler import AnimationScheduler
+from .task_model import TaskListModel
+from .task_filter_model import TaskSortFilterModel, SORT_MODES
+from .task_delegate import TaskItemDelegate, ROW_HEIGHT
+from .task_list_view import TaskListView
+from .background_sync import BackgroundSync, SYNCED, FAILED
+from models.database import epoch_day, due_window_days
+from models.task_store import TaskStore
+from .startup import lazy_import
+from datetime import date
 import os
 import sys
 
+# 对话框、统计图表（matplotlib）和同步（webdav3）在第一次使用时才导入
+TaskDialog = lazy_import('gui.task_dialog', 'TaskDialog')
+StatisticsDialog = lazy_import('gui.statistics_dialog', 'StatisticsDialog')
+PomodoroDialog = lazy_import('gui.pomodoro', 'PomodoroDialog')
+WebDAVSync = lazy_import('sync.webdav_sync', 'WebDAVSync')
+
+# WebDAVSync 保存连接配置的文件（WebDAVSync.config_file），读取它无需导入 webdav3
+SYNC_CONFIG_FILE = 'webdav_config.json'
+
+# 统计面板展示的历史天数
+STATISTICS_HISTORY_DAYS = 365
+# 搜索框停止输入多久后才开始筛选（毫秒）
+SEARCH_DEBOUNCE_MS = 200
+
 class MainWindow(QMainWindow):
     def __init__(self, db):
         super().__init__()
         self.db = db
-        self.sync = WebDAVSync(db)
+        # 任务缓存由列表、统计和同步共用，写入后通过信号通知变化
+        self.store = TaskStore(db, self)
+        self.store.task_added.connect(self._on_task_changed)
+        self.store.task_updated.connect(self._on_task_changed)
+        self.store.task_removed.connect(self._on_task_removed)
+        self.store.tasks_reset.connect(self.load_tasks)
+        # 本地修改后在后台延迟同步
+        self.store.task_added.connect(self._schedule_sync)
+        self.store.task_updated.connect(self._schedule_sync)
+        self.store.task_removed.connect(self._schedule_sync)
+        # 界面发起的数据库操作在后台线程执行，避免阻塞事件循环
+        self.async_db = AsyncDatabase(self.store, parent=self)
+        self._sync = None
+        self.background_sync = None
         self.setWindowTitle("任务管理器")
         self.setMinimumSize(800, 600)
         
@@ -32,8 +66,8 @@ class MainWindow(QMainWindow):
             "pomodoro": QIcon(os.path.join(self.image_dir, "pomodoro_icon.png"))
         }
         
-        # 动画相关
-        self.animations = {}
+        # 所有界面动画由同一个调度器驱动，只动画可见行并限制并发数量
+        self.animations = AnimationScheduler(self)
         self.setup_ui()
         self.load_tasks()
         
@@ -78,36 +112,74 @@ class MainWindow(QMainWindow):
         toolbar_layout.addWidget(self.sync_status)
         
         toolbar_layout.addStretch()
+        
+        # 逾期任务数
+        self.overdue_label = QLabel()
+        self.overdue_label.setStyleSheet("color: #F44336;")
+        toolbar_layout.addWidget(self.overdue_label)
+        
+        # 截止日期筛选
+        self.due_filter = QComboBox()
+        self.due_filter.addItem("全部任务", None)
+        self.due_filter.addItem("今天", "today")
+        self.due_filter.addItem("明天", "tomorrow")
+        self.due_filter.addItem("本周", "week")
+        self.due_filter.addItem("已逾期", "overdue")
+        self.due_filter.currentIndexChanged.connect(self.load_tasks)
+        toolbar_layout.addWidget(self.due_filter)
+        
         layout.addLayout(toolbar_layout)
         
-        # 任务列表
-        self.task_list = QListWidget()
+        # 搜索与排序：都在内存中完成，不重新查询数据库
+        filter_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索任务名称或标签")
+        self.search_edit.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.search_edit)
+        
+        self.sort_mode = QComboBox()
+        for mode, label in SORT_MODES.items():
+            self.sort_mode.addItem(f"按{label}排序", mode)
+        filter_layout.addWidget(self.sort_mode)
+        layout.addLayout(filter_layout)
+        
+        # 连续输入时只在停顿后筛选一次
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self._apply_search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        
+        # 任务列表：模型保存任务记录，委托只绘制进入视口的行，
+        # 筛选排序层决定显示哪些任务以及显示顺序
+        self.task_model = TaskListModel(self)
+        self.task_proxy = TaskSortFilterModel(self)
+        self.task_proxy.setSourceModel(self.task_model)
+        self.sort_mode.currentIndexChanged.connect(
+            lambda: self.task_proxy.set_sort_mode(self.sort_mode.currentData()))
+        self.task_delegate = TaskItemDelegate(self.icons, self)
+        self.task_list = TaskListView(ROW_HEIGHT)
+        self.task_list.setModel(self.task_proxy)
+        self.task_list.setItemDelegate(self.task_delegate)
+        self.task_list.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.task_list.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.task_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.task_list.setMouseTracking(True)
         self.task_list.setStyleSheet("""
-            QListWidget {
+            TaskListView {
                 background-color: #f5f5f5;
                 border-radius: 5px;
                 padding: 10px;
-            }
-            QListWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #ddd;
-                min-height: 80px;
-                background-color: white;  /* 添加默认背景色 */
-            }
-            QListWidget::item:hover {
-                background-color: #e0f7fa;
-            }
-            QListWidget::item:selected {
-                background-color: #e0f7fa;  /* 选中时的背景色 */
-            }
-            QListWidget::item:focus {
-                background-color: white;  /* 失去焦点时恢复原色 */
                 outline: none;  /* 移除焦点边框 */
+                /* 选中效果由委托绘制，表格视图不再绘制整行的选中背景 */
+                selection-background-color: transparent;
             }
         """)
-        self.task_list.itemClicked.connect(self.handle_item_click)  # 添加点击处理
         layout.addWidget(self.task_list)
         
+        # 每帧所有行动画更新完后统一重绘一次视口
+        self.animations.frame.connect(self.task_list.viewport().update)
+        
         # 添加任务按钮
         add_button = QPushButton("添加任务")
         add_button.setIcon(self.icons["add"])
@@ -136,164 +208,197 @@ class MainWindow(QMainWindow):
         layout.addLayout(button_layout)
         
     def add_button_animation(self, button):
-        """为按钮添加点击动画"""
-        animation = QPropertyAnimation(button, b"geometry")
-        animation.setDuration(100)
-        animation.setEasingCurve(QEasingCurve.Type.OutQuad)
-        
+        """为按钮添加点击动画：先放大 2 像素再恢复原尺寸"""
         def animate():
+            if self.animations.is_running(button):
+                return
             original = button.geometry()
-            animation.setStartValue(original)
-            animation.setEndValue(original.adjusted(-2, -2, 2, 2))
-            animation.start()
-            
+            self.animations.animate(
+                button, 2, 0, 100,
+                lambda grow: button.setGeometry(original.adjusted(
+                    -round(grow), -round(grow), round(grow), round(grow))),
+                easing=QEasingCurve.Type.OutQuad)
+
         button.clicked.connect(animate)
-        self.animations[button] = animation
         
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._sync is None and os.path.exists(SYNC_CONFIG_FILE):
+            # 只有保存过连接配置才需要自动同步；首次绘制之后再创建同步对象，
+            # 没有配置时 webdav3 直到第一次手动同步才被导入
+            QTimer.singleShot(0, self._start_sync)
+
+    def _start_sync(self):
+        """创建同步对象，并在同步线程中读取保存的配置连接服务器"""
+        if self._sync is None:
+            self._create_sync()
+            self.background_sync.load_config()
+
+    @property
+    def sync(self):
+        """WebDAV 同步对象，第一次使用时才创建"""
+        if self._sync is None:
+            self._create_sync()
+        return self._sync
+
+    def _create_sync(self):
+        self._sync = WebDAVSync(self.store)
+        # 同步在独立线程中执行，状态通过信号更新到工具栏
+        self.background_sync = BackgroundSync(self._sync, self)
+        self.background_sync.connected.connect(self._on_sync_connected)
+        self.background_sync.started.connect(self._on_sync_started)
+        self.background_sync.progress.connect(self._on_sync_progress)
+        self.background_sync.finished.connect(self._on_sync_finished)
+
+    def _schedule_sync(self, task):
+        """本地写入后安排一次延迟同步，连续的修改合并为一次传输
+
+        同步自身写入的任务已标记为已同步，不会再次触发。删除（task 为任务 ID）无法区分来源，
+        总是安排同步：同步进行中时会在本次结束后再同步一次，远程删除最多多出一次空闲同步。
+        """
+        if self.background_sync is None:
+            return
+        if isinstance(task, int) or task.sync_status == 'pending':
+            self.background_sync.schedule()
+
+    def _set_sync_status(self, text, color):
+        self.sync_status.setText(f"同步状态：{text}")
+        self.sync_status.setStyleSheet(f"color: {color};")
+
+    def _on_sync_connected(self, connected):
+        if connected:
+            self._set_sync_status("已连接", "green")
+
+    def _on_sync_started(self):
+        self._set_sync_status("同步中", "blue")
+
+    def _on_sync_progress(self, message):
+        self._set_sync_status(message, "blue")
+
+    def _on_sync_finished(self, status):
+        # 同步修改的任务已通过 TaskStore 的信号逐个更新到列表中
+        if status == SYNCED:
+            self._set_sync_status("已同步", "green")
+        elif status == FAILED:
+            self._set_sync_status("同步失败", "red")
+        else:
+            self._set_sync_status("已取消", "gray")
+
     def load_tasks(self):
-        """加载任务列表并添加动画"""
-        self.task_list.clear()
-        tasks = self.db.get_all_tasks()
-        
-        for task in tasks:
-            item = QListWidgetItem()
-            
-            # 创建主容器
-            container = QWidget()
-            container_layout = QVBoxLayout(container)
-            container_layout.setContentsMargins(5, 5, 5, 5)
-            
-            # 创建任务内容widget
-            content_widget = QWidget()
-            content_widget.setAutoFillBackground(True)
-            content_widget.setStyleSheet("""
-                QWidget {
-                    background-color: white;
-                    border-radius: 8px;
-                    border: 1px solid #e0e0e0;
-                    padding: 12px;
-                }
-                QWidget:hover {
-                    background-color: #f5f5f5;
-                    border-color: #bdbdbd;
-                }
-            """)
-            
-            # 任务内容布局
-            layout = QHBoxLayout(content_widget)
-            layout.setContentsMargins(8, 8, 8, 8)
-            layout.setSpacing(15)
-            
-            # 左侧信息布局
-            left_layout = QVBoxLayout()
-            left_layout.setSpacing(8)
-            left_layout.setContentsMargins(0, 0, 0, 0)
-            
-            # 任务标题和优先级
-            title_layout = QHBoxLayout()
-            title_layout.setSpacing(12)
-            title_layout.setContentsMargins(0, 0, 0, 0)
-            
-            # 优先级图标
-            priority_icon = QLabel()
-            priority_icon.setFixedSize(28, 28)
-            if task[2] == "高":
-                priority_icon.setPixmap(self.icons["high"].pixmap(28, 28))
-            elif task[2] == "中":
-                priority_icon.setPixmap(self.icons["medium"].pixmap(28, 28))
-            else:
-                priority_icon.setPixmap(self.icons["low"].pixmap(28, 28))
-            title_layout.addWidget(priority_icon)
-            
-            # 任务名称
-            task_name = QLabel(task[1])
-            task_name.setStyleSheet("""
-                font-size: 16px;
-                font-weight: 500;
-                color: #212121;
-            """)
-            title_layout.addWidget(task_name, 1)
-            left_layout.addLayout(title_layout)
-            
-            # 截止日期
-            deadline = QLabel(f"⏰ {task[3]}")
-            deadline.setStyleSheet("""
-                color: #757575;
-                font-size: 13px;
-                padding-left: 40px;
-            """)
-            left_layout.addWidget(deadline)
-            
-            layout.addLayout(left_layout, 1)
-            
-            # 右侧进度条布局
-            right_layout = QVBoxLayout()
-            right_layout.setSpacing(6)
-            right_layout.setContentsMargins(0, 0, 0, 0)
-            
-            # 进度条
-            progress = QProgressBar()
-            progress.setValue(task[4])
-            progress.setFixedWidth(180)
-            progress.setFixedHeight(24)
-            progress.setStyleSheet("""
-                QProgressBar {
-                    background-color: #f5f5f5;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 12px;
-                    text-align: center;
-                    font-size: 12px;
-                    color: #616161;
-                }
-                QProgressBar::chunk {
-                    background-color: #4CAF50;
-                    border-radius: 12px;
-                    border: 1px solid #43A047;
-                }
-            """)
-            
-            # 进度文本
-            progress_text = QLabel(f"进度：{task[4]}%")
-            progress_text.setStyleSheet("""
-                color: #616161;
-                font-size: 13px;
-                font-weight: 500;
-            """)
-            progress_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            right_layout.addWidget(progress)
-            right_layout.addWidget(progress_text)
-            right_layout.addStretch()
-            
-            layout.addLayout(right_layout)
-            
-            # 设置最小高度
-            content_widget.setMinimumHeight(100)
-            
-            # 将内容添加到容器
-            container_layout.addWidget(content_widget)
-            
-            # 设置列表项属性
-            item.setSizeHint(container.sizeHint())
-            self.task_list.addItem(item)
-            self.task_list.setItemWidget(item, container)
-            
-            # 添加动画效果
-            animation = QPropertyAnimation(content_widget, b"pos")
-            animation.setDuration(300)
-            animation.setStartValue(content_widget.pos() - QPoint(content_widget.width(), 0))
-            animation.setEndValue(content_widget.pos())
-            animation.setEasingCurve(QEasingCurve.Type.OutCubic)
-            animation.start()
+        """在后台读取任务，新的刷新请求会取代尚未完成的旧请求"""
+        on_error = self._error_handler("加载任务列表")
+        window = self.due_filter.currentData()
+        if window is None:
+            self.async_db.submit('tasks', key='load_tasks',
+                                 callback=self.populate_tasks, error_callback=on_error)
+        elif window == "overdue":
+            self.async_db.submit('get_overdue_tasks', key='load_tasks',
+                                 callback=self.populate_tasks, error_callback=on_error)
+        else:
+            self.async_db.submit('get_tasks_due_in', window, key='load_tasks',
+                                 callback=self.populate_tasks, error_callback=on_error)
+        self._refresh_overdue_count()
+
+    def _update_overdue_count(self, count):
+        self.overdue_label.setText(f"逾期：{count}" if count else "")
+
+    def populate_tasks(self, tasks):
+        """用读取到的任务填充列表，并让可见的行滑入"""
+        self.animations.stop_all(jump_to_end=False)
+        self.task_delegate.row_offsets.clear()
+        self.task_model.set_tasks(tasks)
+        self._slide_in_rows(self._visible_rows())
+
+    def _visible_rows(self):
+        """与视口相交的行号范围"""
+        viewport = self.task_list.viewport()
+        count = self.task_proxy.rowCount()
+        if count == 0:
+            return range(0)
+        # 行高固定，只需找到第一行即可推算出可见范围
+        first = self.task_list.indexAt(QPoint(viewport.width() // 2, 0))
+        first = first.row() if first.isValid() else 0
+        return range(first, min(count, first + viewport.height() // ROW_HEIGHT + 2))
+
+    def _slide_in_rows(self, rows):
+        """让指定的行从左侧滑入，离开视口的行不创建动画"""
+        offsets = self.task_delegate.row_offsets
+        width = self.task_list.viewport().width()
+        for row in rows:
+            task_id = self.task_proxy.task_at(row).id
+
+            def step(offset, task_id=task_id):
+                offsets[task_id] = offset
+
+            self.animations.animate(('slide', task_id), -width, 0, 300, step,
+                                    finished=lambda task_id=task_id: offsets.pop(task_id, None))
+
+    def _on_task_changed(self, task):
+        self.apply_task_change(task.id, task)
+        self._refresh_overdue_count()
+
+    def _on_task_removed(self, task_id):
+        self.apply_task_change(task_id, None)
+        self._refresh_overdue_count()
+
+    def _refresh_overdue_count(self):
+        self.async_db.submit('count_overdue_tasks', key='overdue_count',
+                             callback=self._update_overdue_count)
+
+    def apply_task_change(self, task_id, task):
+        """把 TaskStore 通知的单个任务变化应用到列表：插入、原地更新或删除，保持滚动位置与选中项"""
+        if task is None or not self._matches_due_filter(task):
+            self.task_model.remove_task(task_id)
+        elif not self.task_model.update_task(task):
+            # 新任务追加到模型末尾，显示位置由筛选排序层决定
+            self.task_model.insert_task(self.task_model.rowCount(), task)
+            row = self.task_proxy.row_of(task.id)
+            if row is not None and row in self._visible_rows():
+                self._slide_in_rows([row])
+
+    def _matches_due_filter(self, task):
+        window = self.due_filter.currentData()
+        if window is None:
+            return True
+        try:
+            day = epoch_day(date.fromisoformat(task.deadline))
+        except (TypeError, ValueError):
+            return False
+        if window == "overdue":
+            return day < epoch_day() and task.progress < 100
+        start, end = due_window_days(window)
+        return start <= day <= end
+
+    def _apply_search(self):
+        self.task_proxy.set_filter_text(self.search_edit.text())
             
+    def _error_handler(self, action):
+        """生成后台操作出错时弹出提示的回调"""
+        def handle(error):
+            QMessageBox.warning(self, "错误", f"{action}时出错: {str(error)}")
+        return handle
+
     def show_statistics(self):
-        """显示统计对话框"""
+        """在后台读取统计数据后显示统计对话框"""
+        self.async_db.submit(self._load_statistics, key='statistics',
+                             callback=self._show_statistics_dialog,
+                             error_callback=self._error_handler("显示统计信息"))
+
+    def _load_statistics(self):
+        """在后台线程中读取状态计数与最近一段时间的每日汇总"""
+        today = date.today()
+        end_day = epoch_day(today)
+        start_day = end_day - STATISTICS_HISTORY_DAYS + 1
+        rows = self.store.get_daily_rollups(start_day, end_day)
+        return self.store.get_task_statistics(), (start_day, end_day, today, rows)
+
+    def _show_statistics_dialog(self, result):
+        stats, history = result
         try:
-            stats = self.db.get_task_statistics()
             if stats['total'] == 0:
                 QMessageBox.information(self, "提示", "当前没有任务数据可供统计")
                 return
-            dialog = StatisticsDialog(stats, self)
+            dialog = StatisticsDialog(stats, self, history=history)
             dialog.exec()
         except Exception as e:
             QMessageBox.warning(self, "错误", f"显示统计信息时出错: {str(e)}")
@@ -301,13 +406,13 @@ class MainWindow(QMainWindow):
     def show_pomodoro(self):
         """显示番茄钟对话框"""
         try:
-            dialog = PomodoroDialog(self)
+            dialog = PomodoroDialog(self, db=self.async_db)
             dialog.exec()
         except Exception as e:
             QMessageBox.warning(self, "错误", f"打开番茄钟时出错: {str(e)}")
     
     def manual_sync(self):
-        """手动同步任务"""
+        """手动同步任务，同步在后台线程中进行；同步进行中再次点击可取消"""
         try:
             if not self.sync.connected:
                 reply = QMessageBox.question(
@@ -321,7 +426,18 @@ class MainWindow(QMainWindow):
                     # TODO: 添加WebDAV设置对话框
                     pass
                 return
-                
+
+            if self.background_sync.running:
+                reply = QMessageBox.question(
+                    self,
+                    "取消同步",
+                    "正在同步，要取消吗？",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.Yes:
+                    self.background_sync.cancel()
+                return
+
             reply = QMessageBox.question(
                 self,
                 "确认同步",
@@ -330,13 +446,7 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                if self.sync.sync_tasks():
-                    self.sync_status.setText("同步状态：已同步")
-                    self.sync_status.setStyleSheet("color: green;")
-                    self.load_tasks()  # 刷新任务列表
-                else:
-                    self.sync_status.setText("同步状态：同步失败")
-                    self.sync_status.setStyleSheet("color: red;")
+                self.background_sync.sync_now()
         except Exception as e:
             QMessageBox.warning(self, "错误", f"同步任务时出错: {str(e)}")
     
@@ -347,36 +457,39 @@ class MainWindow(QMainWindow):
             if dialog.exec():
                 task_data = dialog.get_task_data()
                 if task_data and task_data["name"].strip():
-                    task_id = self.db.add_task(task_data)
-                    if task_id:
-                        self.load_tasks()
-                        self.sync_status.setText("同步状态：待同步")
-                        self.sync_status.setStyleSheet("color: orange;")
+                    self.async_db.submit('add_task', task_data,
+                                         callback=self._on_task_added,
+                                         error_callback=self._error_handler("添加任务"))
         except Exception as e:
             QMessageBox.warning(self, "错误", f"添加任务时出错: {str(e)}")
 
+    def _on_task_added(self, task_id):
+        if task_id:
+            self.sync_status.setText("同步状态：待同步")
+            self.sync_status.setStyleSheet("color: orange;")
+
     def contextMenuEvent(self, event):
         """右键菜单事件"""
-        item = self.task_list.itemAt(self.task_list.mapFromGlobal(event.globalPos()))
-        if item is not None:
+        index = self.task_list.indexAt(
+            self.task_list.viewport().mapFromGlobal(event.globalPos()))
+        if index.isValid():
+            task_id = index.data(TaskListModel.TaskIdRole)
             menu = QMenu(self)
             
             delete_action = menu.addAction("删除任务")
-            delete_action.triggered.connect(lambda: self.delete_task(item))
+            delete_action.triggered.connect(lambda: self.delete_task(task_id))
             
             complete_action = menu.addAction("标记为完成")
-            complete_action.triggered.connect(lambda: self.mark_task_complete(item))
+            complete_action.triggered.connect(lambda: self.mark_task_complete(task_id))
             
             edit_action = menu.addAction("编辑任务")
-            edit_action.triggered.connect(lambda: self.edit_task(item))
+            edit_action.triggered.connect(lambda: self.edit_task(task_id))
             
             menu.exec(event.globalPos())
     
-    def delete_task(self, item):
+    def delete_task(self, task_id):
         """删除任务"""
         try:
-            index = self.task_list.row(item)
-            task_id = self.db.get_all_tasks()[index][0]
             reply = QMessageBox.question(
                 self,
                 "确认删除",
@@ -385,51 +498,39 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                self.db.delete_task(task_id)
-                self.load_tasks()
+                self.async_db.submit('delete_task', task_id,
+                                     error_callback=self._error_handler("删除任务"))
         except Exception as e:
             QMessageBox.warning(self, "错误", f"删除任务时出错: {str(e)}")
     
-    def mark_task_complete(self, item):
+    def mark_task_complete(self, task_id):
         """标记任务为完成"""
         try:
-            index = self.task_list.row(item)
-            task_id = self.db.get_all_tasks()[index][0]
-            self.db.update_task_progress(task_id, 100)
-            self.load_tasks()
+            self.task_proxy.mark_used(task_id)
+            self.async_db.submit('update_task_progress', task_id, 100,
+                                 error_callback=self._error_handler("更新任务状态"))
         except Exception as e:
             QMessageBox.warning(self, "错误", f"更新任务状态时出错: {str(e)}")
     
-    def edit_task(self, item):
+    def edit_task(self, task_id):
         """编辑任务"""
         try:
-            index = self.task_list.row(item)
-            task = self.db.get_all_tasks()[index]
-            dialog = TaskDialog(
-                self,
-                edit_mode=True,
-                task_data={
-                    'id': task[0],
-                    'name': task[1],
-                    'priority': task[2],
-                    'deadline': task[3]
-                }
-            )
+            task = self.store.get_task(task_id)
+            if task is None:
+                return
+            self.task_proxy.mark_used(task_id)
+            dialog = TaskDialog(self, edit_mode=True, task=task)
             if dialog.exec():
                 updated_data = dialog.get_task_data()
                 if updated_data:
-                    self.db.update_task(updated_data)
-                    self.load_tasks()
+                    self.async_db.submit('update_task', updated_data,
+                                         error_callback=self._error_handler("编辑任务"))
         except Exception as e:
             QMessageBox.warning(self, "错误", f"编辑任务时出错: {str(e)}")
     
-    def handle_item_click(self, item):
-        """处理任务项点击事件"""
-        # 清除其他项的选中状态
-        for i in range(self.task_list.count()):
-            other_item = self.task_list.item(i)
-            if other_item != item:
-                other_item.setSelected(False)
-        
-        # 设置当前项的选中状态
-        item.setSelected(True)
+    def closeEvent(self, event):
+        """关闭窗口前取消进行中的同步，并等待后台数据库操作结束"""
+        if self.background_sync is not None:
+            self.background_sync.shutdown()
+        self.async_db.shutdown()
+        super().closeEvent(event)
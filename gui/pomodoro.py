@@ -1,18 +1,46 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QPushButton, 
                            QLabel, QProgressBar, QHBoxLayout, QComboBox, QMessageBox)
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import QTimer, Qt, QEvent
 from PyQt6.QtGui import QIcon
+from datetime import datetime, timezone
+import math
 import os
+import time
+
+# 累积多少个已完成的专注时段后写入数据库，关闭对话框时也会写入
+SESSION_BATCH_SIZE = 5
+
+
+def _utc_now():
+    """与 SQLite CURRENT_TIMESTAMP 相同格式的当前 UTC 时间"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
 
 class PomodoroDialog(QDialog):
-    def __init__(self, parent=None):
+    """番茄钟
+
+    剩余时间由单调时钟上的截止时刻计算，事件循环卡顿不会累积误差。
+    对话框可见时每秒在秒数变化处刷新一次显示；不可见时只在计时结束时唤醒。
+    完成的专注时段先缓存，再通过 db（AsyncDatabase）批量写入 pomodoro_sessions 表。
+    """
+
+    def __init__(self, parent=None, db=None):
         super().__init__(parent)
         self.setWindowTitle("番茄钟")
         self.setMinimumSize(400, 300)
+        self.db = db
         
         # 初始化变量
-        self.time_left = 25 * 60
-        self.timer = QTimer()
+        self.duration = 25 * 60
+        self.time_left = self.duration
+        # 运行时为 time.monotonic() 上的结束时刻，暂停时为 None
+        self.deadline = None
+        self.started_at = None
+        self.pending_sessions = []
+        # 单次定时器，每次按需要重新设定间隔
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)
         self.timer.timeout.connect(self.update_timer)
         self.is_break = False
         
@@ -98,14 +126,45 @@ class PomodoroDialog(QDialog):
     
     def change_mode(self, text):
         minutes = int(text.replace("分钟", ""))
-        self.time_left = minutes * 60
+        self.duration = minutes * 60
+        self.time_left = self.duration
+        if self.deadline is not None:
+            self.deadline = time.monotonic() + self.time_left
+            self.schedule_tick()
         self.progress_bar.setMaximum(self.time_left)
         self.progress_bar.setValue(self.time_left)
         self.update_display()
         
+    def remaining(self):
+        """剩余秒数（浮点），运行时由截止时刻计算"""
+        if self.deadline is None:
+            return self.time_left
+        return max(0.0, self.deadline - time.monotonic())
+
+    def run_countdown(self, seconds):
+        """从 seconds 秒开始倒计时"""
+        self.time_left = seconds
+        self.deadline = time.monotonic() + seconds
+        self.schedule_tick()
+
+    def schedule_tick(self):
+        """可见时在下一次显示的秒数变化处唤醒，不可见时直接等到计时结束"""
+        remaining = self.remaining()
+        if self.is_display_visible():
+            delay = remaining - math.ceil(remaining) + 1 if remaining % 1 else 1.0
+            delay = min(delay, remaining)
+        else:
+            delay = remaining
+        self.timer.start(max(1, math.ceil(delay * 1000)))
+
+    def is_display_visible(self):
+        return self.isVisible() and not self.isMinimized()
+
     def start_timer(self):
         if self.start_button.text() == "开始":
-            self.timer.start(1000)
+            if self.started_at is None and not self.is_break:
+                self.started_at = _utc_now()
+            self.run_countdown(self.time_left)
             self.start_button.setText("暂停")
             self.start_button.setStyleSheet("""
                 QPushButton {
@@ -120,6 +179,8 @@ class PomodoroDialog(QDialog):
                 }
             """)
         else:
+            self.time_left = math.ceil(self.remaining())
+            self.deadline = None
             self.timer.stop()
             self.start_button.setText("开始")
             self.start_button.setStyleSheet("""
@@ -136,19 +197,23 @@ class PomodoroDialog(QDialog):
             """)
             
     def update_timer(self):
-        self.time_left -= 1
-        minutes = self.time_left // 60
-        seconds = self.time_left % 60
-        self.time_label.setText(f"{minutes:02d}:{seconds:02d}")
-        self.progress_bar.setValue(self.time_left)
-        
-        if self.time_left <= 0:
-            self.timer.stop()
-            self.handle_timer_complete()
+        if self.deadline is None:
+            return
+        remaining = self.remaining()
+        if remaining > 0:
+            if self.is_display_visible():
+                self.update_display()
+            self.schedule_tick()
+            return
+        self.deadline = None
+        self.time_left = 0
+        self.update_display()
+        self.handle_timer_complete()
     
     def handle_timer_complete(self):
         """处理计时完成事件"""
         if not self.is_break:
+            self.record_session()
             reply = QMessageBox.question(self, '休息提醒', 
                                        '工作时间结束，是否开始休息？\n(5分钟)',
                                        QMessageBox.StandardButton.Yes | 
@@ -156,10 +221,9 @@ class PomodoroDialog(QDialog):
             
             if reply == QMessageBox.StandardButton.Yes:
                 self.is_break = True
-                self.time_left = 5 * 60  # 5分钟休息
                 self.progress_bar.setMaximum(5 * 60)
-                self.progress_bar.setValue(self.time_left)
-                self.timer.start(1000)
+                self.progress_bar.setValue(5 * 60)
+                self.run_countdown(5 * 60)  # 5分钟休息
                 self.setStyleSheet("background-color: #E8F5E9;")  # 休息时背景变绿
             else:
                 self.reset_timer()
@@ -171,7 +235,10 @@ class PomodoroDialog(QDialog):
             
     def reset_timer(self):
         self.timer.stop()
-        self.time_left = 25 * 60
+        self.deadline = None
+        self.started_at = None
+        self.time_left = self.duration
+        self.progress_bar.setMaximum(self.duration)
         self.progress_bar.setValue(self.time_left)
         self.update_display()
         self.start_button.setText("开始")
@@ -189,6 +256,51 @@ class PomodoroDialog(QDialog):
         """)
         
     def update_display(self):
-        minutes = self.time_left // 60
-        seconds = self.time_left % 60
+        time_left = math.ceil(self.remaining())
+        minutes = time_left // 60
+        seconds = time_left % 60
         self.time_label.setText(f"{minutes:02d}:{seconds:02d}")
+        self.progress_bar.setValue(time_left)
+
+    def record_session(self):
+        """记录一个完成的专注时段，攒够一批再写入数据库"""
+        self.pending_sessions.append({
+            "started_at": self.started_at or _utc_now(),
+            "ended_at": _utc_now(),
+            "duration": self.duration,
+        })
+        self.started_at = None
+        if len(self.pending_sessions) >= SESSION_BATCH_SIZE:
+            self.flush_sessions()
+
+    def flush_sessions(self):
+        if not self.pending_sessions or self.db is None:
+            return
+        sessions, self.pending_sessions = self.pending_sessions, []
+        self.db.submit('add_pomodoro_sessions', sessions)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._visibility_changed()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._visibility_changed()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._visibility_changed()
+
+    def _visibility_changed(self):
+        """重新显示时立即刷新，并按可见状态重新安排唤醒时间"""
+        if self.is_display_visible():
+            self.update_display()
+        if self.deadline is not None:
+            self.schedule_tick()
+
+    def done(self, result):
+        self.deadline = None
+        self.timer.stop()
+        self.flush_sessions()
+        super().done(result)
@@ -0,0 +1,163 @@
+from importlib.abc import MetaPathFinder
+import importlib
+import sys
+import time
+
+# 启动时在 QApplication 之前就会导入本模块，这里只依赖标准库
+
+
+def lazy_import(module_name, attribute):
+    """返回模块属性的轻量代理，第一次调用或访问属性时才真正导入模块
+
+    用于对话框、统计图表和同步这类大多数会话用不到的子系统，
+    让启动时只加载任务列表所需的模块。
+    """
+    return _LazyAttribute(module_name, attribute)
+
+
+class _LazyAttribute:
+    __slots__ = ('_module_name', '_attribute', '_target')
+
+    def __init__(self, module_name, attribute):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+
+    def resolve(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = getattr(module, self._attribute)
+        return self._target
+
+    @property
+    def loaded(self):
+        return self._target is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {self._module_name}.{self._attribute} ({state})>"
+
+
+class _TimedLoader:
+    """包装模块加载器，记录创建和执行模块所用的时间
+
+    扩展模块（如 PyQt6.QtWidgets）的主要开销在 create_module 中，
+    因此计时从 create_module 开始，到 exec_module 结束。
+    """
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        self._profiler._enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._profiler._leave()
+            raise
+
+    def exec_module(self, module):
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave()
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(MetaPathFinder):
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """记录启动过程中各模块的导入时间以及首个窗口显示所用的时间
+
+    install() 之后导入的模块都会被计时：cumulative 为包含其依赖在内的
+    总时间，self 为扣除嵌套导入后模块自身的执行时间。
+    """
+
+    # 这些子系统应当在首次使用时才加载，报告中会标出它们是否已被导入
+    LAZY_MODULES = ('matplotlib', 'numpy', 'webdav3', 'sync.webdav_sync',
+                    'gui.statistics_dialog', 'gui.pomodoro', 'gui.task_dialog')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.imports = []
+        self.first_window_ms = None
+        self._stack = []
+        self._finder = None
+        self._first_paint_filter = None
+
+    def install(self):
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+        return self
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _leave(self):
+        name, started, children = self._stack.pop()
+        cumulative = (time.perf_counter() - started) * 1000
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.imports.append((name, cumulative - children, cumulative, len(self._stack)))
+
+    def watch_first_show(self, window):
+        """窗口第一次绘制时记录启动耗时并停止导入计时"""
+        from PyQt6.QtCore import QObject, QEvent
+
+        profiler = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint and profiler.first_window_ms is None:
+                    profiler.first_window_ms = (time.perf_counter() - profiler.started_at) * 1000
+                    profiler.uninstall()
+                    obj.removeEventFilter(self)
+                    profiler.report()
+                return False
+
+        self._first_paint_filter = _FirstPaintFilter(window)
+        window.installEventFilter(self._first_paint_filter)
+
+    def report(self, limit=20, file=None):
+        """打印启动报告：首个窗口显示时间与导入耗时最多的模块"""
+        file = file if file is not None else sys.stderr
+        print("启动报告", file=file)
+        if self.first_window_ms is not None:
+            print(f"  首个窗口显示: {self.first_window_ms:.1f} ms", file=file)
+        total = sum(entry[2] for entry in self.imports if entry[3] == 0)
+        print(f"  模块导入合计: {total:.1f} ms（{len(self.imports)} 个模块）", file=file)
+        print(f"  {'模块':<40}{'self ms':>10}{'cumulative ms':>15}", file=file)
+        slowest = sorted(self.imports, key=lambda entry: entry[2], reverse=True)
+        for name, self_ms, cumulative_ms, _ in slowest[:limit]:
+            print(f"  {name:<40}{self_ms:>10.1f}{cumulative_ms:>15.1f}", file=file)
+        loaded = [name for name in self.LAZY_MODULES if name in sys.modules]
+        print(f"  已加载的延迟子系统: {', '.join(loaded) if loaded else '无'}", file=file)
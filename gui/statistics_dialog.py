@@ -1,56 +1,195 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QFrame
-from PyQt6.QtCore import Qt
-import matplotlib
-matplotlib.use('Qt5Agg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QFrame, QSizePolicy
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+# 只使用面向对象的 Figure 与 Agg 画布，不经过 pyplot，图表不会进入全局注册表
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
+from datetime import date, timedelta
+
+from models.time_series import expand_rollups, aggregate, summarize
+
+CHART_LABELS = ['已完成', '进行中', '待开始']
+CHART_COLORS = ['#4CAF50', '#FFC107', '#F44336']
+# 图表按固定尺寸渲染，显示时再按控件大小缩放
+CHART_SIZE = (6, 7.5)
+CHART_HISTORY_SIZE = (10, 8)
+# 时间序列图显示最近的周数与月数
+RECENT_WEEKS = 12
+RECENT_MONTHS = 12
+CHART_DPI = 100
+# 缓存最近几组统计数据对应的图表
+CHART_CACHE_SIZE = 8
+
+
+def chart_key(stats, history=None):
+    """图表只取决于三种状态的任务数与每日汇总，相同的数据复用同一张图
+
+    history 为 (start_day, end_day, today, rows)：start_day/end_day 为 epoch_day() 形式的天数，
+    today 为 date，rows 来自 Database.get_daily_rollups。
+    """
+    counts = (stats['completed'], stats['in_progress'], stats['pending'])
+    if history is None:
+        return counts, None
+    start_day, end_day, today, rows = history
+    return counts, (start_day, end_day, today, tuple(rows))
+
+
+def _day_label(day, period):
+    value = date(1970, 1, 1) + timedelta(days=int(day))
+    return f"{value.month}/{value.day}" if period == 'week' else f"{value.year % 100:02d}/{value.month}"
+
+
+def render_chart_image(key):
+    """用 Agg 后端绘制状态分布与完成趋势图，返回 QImage，可在后台线程中调用"""
+    sizes, history = key
+    sizes = list(sizes)
+    fig = Figure(figsize=CHART_HISTORY_SIZE if history else CHART_SIZE, dpi=CHART_DPI)
+    try:
+        canvas = FigureCanvasAgg(fig)
+        if history:
+            (ax1, ax3), (ax2, ax4) = fig.subplots(2, 2)
+        else:
+            ax1, ax2 = fig.subplots(2, 1)
+
+        # 绘制饼图
+        ax1.pie(sizes, labels=CHART_LABELS, colors=CHART_COLORS, autopct='%1.1f%%',
+                startangle=90)
+        ax1.set_title('任务状态分布')
+
+        # 绘制柱状图
+        x = np.arange(len(CHART_LABELS))
+        ax2.bar(x, sizes, color=CHART_COLORS)
+        ax2.set_title('任务数量统计')
+        ax2.set_xticks(x)
+        ax2.set_xticklabels(CHART_LABELS)
+
+        if history:
+            start_day, end_day, today, rows = history
+            rollups = expand_rollups(rows, start_day, end_day)
+            _plot_weekly(ax3, aggregate(rollups, 'week', today))
+            _plot_monthly(ax4, aggregate(rollups, 'month', today))
+
+        fig.tight_layout()
+        canvas.draw()
+        width, height = canvas.get_width_height()
+        # QImage 不持有缓冲区，copy() 之后才能释放 Figure
+        return QImage(canvas.buffer_rgba(), width, height,
+                      QImage.Format.Format_RGBA8888).copy()
+    finally:
+        # 显式释放图表占用的内存
+        fig.clear()
+
+
+def _plot_weekly(ax, series):
+    """最近几周的完成数与逾期数"""
+    starts = series.starts[-RECENT_WEEKS:]
+    x = np.arange(len(starts))
+    ax.bar(x - 0.2, series.completed[-RECENT_WEEKS:], width=0.4, color='#4CAF50', label='完成')
+    ax.bar(x + 0.2, series.overdue[-RECENT_WEEKS:], width=0.4, color='#F44336', label='逾期')
+    ax.set_title('每周完成与逾期')
+    ax.set_xticks(x)
+    ax.set_xticklabels([_day_label(day, 'week') for day in starts], rotation=45, fontsize=8)
+    ax.legend(fontsize=8)
+
+
+def _plot_monthly(ax, series):
+    """最近几个月的完成数与平均完成用时"""
+    starts = series.starts[-RECENT_MONTHS:]
+    x = np.arange(len(starts))
+    ax.bar(x, series.completed[-RECENT_MONTHS:], color='#4CAF50')
+    ax.set_title('每月完成数与平均用时（天）')
+    ax.set_xticks(x)
+    ax.set_xticklabels([_day_label(day, 'month') for day in starts], rotation=45, fontsize=8)
+    days_axis = ax.twinx()
+    days_axis.plot(x, series.average_days[-RECENT_MONTHS:], color='#FFC107', marker='o')
+
+
+class ChartRenderer(QObject):
+    """在后台线程渲染统计图表，并按统计数据缓存渲染结果
+
+    matplotlib 不是线程安全的，因此只使用一个工作线程串行渲染。
+    同一组数据正在渲染时不会重复提交。
+    """
+
+    rendered = pyqtSignal(object, object)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='charts')
+        self._cache = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def cached(self, key):
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def request(self, key):
+        """提交渲染请求，完成后通过 rendered 信号送回 GUI 线程"""
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._render, key)
+
+    def _render(self, key):
+        try:
+            image = render_chart_image(key)
+        except Exception as e:
+            print(f"生成统计图表时出错: {str(e)}")
+            image = None
+        with self._lock:
+            self._pending.discard(key)
+            if image is not None:
+                self._cache[key] = image
+                while len(self._cache) > CHART_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        self.rendered.emit(key, image)
+
 
 class StatisticsDialog(QDialog):
-    def __init__(self, stats, parent=None):
+    def __init__(self, stats, parent=None, history=None):
         super().__init__(parent)
         self.setWindowTitle("任务统计")
         self.setMinimumSize(600, 500)
         self.stats = stats
+        self.history = history
+        self.chart_key = chart_key(stats, history)
+        self.chart_pixmap = None
         self.setup_ui()
-        
+        self.load_chart()
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
-        
+
         # 添加标题
         title = QLabel("任务完成情况统计")
         title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 10px;")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
-        
-        # 创建统计图表
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 10))
-        
-        # 饼图数据
-        labels = ['已完成', '进行中', '待开始']
-        sizes = [
-            self.stats['completed'],
-            self.stats['in_progress'],
-            self.stats['pending']
-        ]
-        colors = ['#4CAF50', '#FFC107', '#F44336']
-        
-        # 绘制饼图
-        ax1.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
-                startangle=90)
-        ax1.set_title('任务状态分布')
-        
-        # 绘制柱状图
-        x = np.arange(len(labels))
-        ax2.bar(x, sizes, color=colors)
-        ax2.set_title('任务数量统计')
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(labels)
-        
-        # 添加到布局
-        canvas = FigureCanvasQTAgg(fig)
-        layout.addWidget(canvas)
-        
+
+        # 统计图表在后台渲染，完成前显示提示
+        self.chart_label = QLabel("正在生成图表…")
+        self.chart_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.chart_label.setMinimumSize(1, 1)
+        self.chart_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        layout.addWidget(self.chart_label)
+
         # 添加统计信息
         stats_frame = QFrame()
         stats_frame.setFrameStyle(QFrame.Shape.StyledPanel)
@@ -62,10 +201,58 @@ class StatisticsDialog(QDialog):
             }
         """)
         stats_layout = QVBoxLayout(stats_frame)
-        
+
         stats_layout.addWidget(QLabel(f"总任务数: {self.stats['total']}"))
         stats_layout.addWidget(QLabel(f"已完成: {self.stats['completed']}"))
         stats_layout.addWidget(QLabel(f"进行中: {self.stats['in_progress']}"))
         stats_layout.addWidget(QLabel(f"待开始: {self.stats['pending']}"))
-        
+        if self.history is not None:
+            start_day, end_day, today, rows = self.history
+            summary = summarize(expand_rollups(rows, start_day, end_day), today)
+            average = summary['average_days']
+            stats_layout.addWidget(QLabel(f"近一年完成: {summary['completed']}"))
+            stats_layout.addWidget(QLabel(
+                f"平均完成时间: {average:.1f} 天" if average is not None else "平均完成时间: -"))
+            stats_layout.addWidget(QLabel(f"近一年逾期: {summary['overdue']}"))
+
         layout.addWidget(stats_frame)
+
+    def load_chart(self):
+        """数据未变化时直接使用缓存的图表，否则交给后台线程渲染"""
+        renderer = ChartRenderer.instance()
+        image = renderer.cached(self.chart_key)
+        if image is not None:
+            self._show_chart(image)
+            return
+        renderer.rendered.connect(self._on_chart_rendered)
+        self.finished.connect(self._disconnect_renderer)
+        renderer.request(self.chart_key)
+
+    def _on_chart_rendered(self, key, image):
+        if key != self.chart_key:
+            return
+        self._disconnect_renderer()
+        if image is None:
+            self.chart_label.setText("统计图表生成失败")
+        else:
+            self._show_chart(image)
+
+    def _disconnect_renderer(self):
+        try:
+            ChartRenderer.instance().rendered.disconnect(self._on_chart_rendered)
+        except TypeError:
+            pass
+
+    def _show_chart(self, image):
+        self.chart_pixmap = QPixmap.fromImage(image)
+        self._scale_chart()
+
+    def _scale_chart(self):
+        if self.chart_pixmap is not None:
+            self.chart_label.setPixmap(self.chart_pixmap.scaled(
+                self.chart_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._scale_chart()
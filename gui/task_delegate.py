@@ -0,0 +1,137 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QRectF, QSize
+from PyQt6.QtGui import QColor, QFont, QPen
+
+from .task_model import TaskListModel
+
+# 与原先逐行创建的控件保持一致的尺寸与配色
+ROW_HEIGHT = 110
+CARD_MARGIN_H = 10
+CARD_MARGIN_V = 5
+CARD_PADDING = 20
+ICON_SIZE = 28
+PROGRESS_WIDTH = 180
+PROGRESS_HEIGHT = 24
+
+CARD_BACKGROUND = QColor("white")
+CARD_HOVER = QColor("#f5f5f5")
+CARD_SELECTED = QColor("#e0f7fa")
+CARD_BORDER = QColor("#e0e0e0")
+CARD_BORDER_HOVER = QColor("#bdbdbd")
+NAME_COLOR = QColor("#212121")
+DEADLINE_COLOR = QColor("#757575")
+PROGRESS_TEXT_COLOR = QColor("#616161")
+PROGRESS_BACKGROUND = QColor("#f5f5f5")
+PROGRESS_CHUNK = QColor("#4CAF50")
+PROGRESS_CHUNK_BORDER = QColor("#43A047")
+
+
+def _font(pixel_size, weight=QFont.Weight.Normal):
+    font = QFont()
+    font.setPixelSize(pixel_size)
+    font.setWeight(weight)
+    return font
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    """直接绘制任务卡片：优先级图标、名称、截止日期与进度条
+
+    不为每一行创建控件，只有进入视口的行才会被绘制，
+    任务数量再多也只占用一份模型数据。
+    """
+
+    def __init__(self, icons, parent=None):
+        super().__init__(parent)
+        # 图标只缩放一次，绘制时直接复用
+        self.priority_pixmaps = {
+            "高": icons["high"].pixmap(ICON_SIZE, ICON_SIZE),
+            "中": icons["medium"].pixmap(ICON_SIZE, ICON_SIZE),
+        }
+        self.default_pixmap = icons["low"].pixmap(ICON_SIZE, ICON_SIZE)
+        self.name_font = _font(16, QFont.Weight.Medium)
+        self.deadline_font = _font(13)
+        self.progress_font = _font(12)
+        self.progress_text_font = _font(13, QFont.Weight.Medium)
+        # 任务 ID -> 滑入动画的水平偏移，只有正在动画的可见行才有记录
+        self.row_offsets = {}
+
+    def sizeHint(self, option, index):
+        # 宽度随视口变化，只需给出固定行高
+        return QSize(0, ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskListModel.TaskRole)
+        if task is None:
+            return
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setRenderHint(painter.RenderHint.TextAntialiasing)
+
+        offset = self.row_offsets.get(task.id, 0)
+        card = QRectF(option.rect).adjusted(
+            CARD_MARGIN_H + offset, CARD_MARGIN_V, -CARD_MARGIN_H + offset, -CARD_MARGIN_V)
+        self._paint_card(painter, option, card)
+
+        content = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        text_left = content.left() + ICON_SIZE + 12
+        text_width = content.right() - PROGRESS_WIDTH - 15 - text_left
+
+        # 优先级图标与任务名称
+        pixmap = self.priority_pixmaps.get(task.priority, self.default_pixmap)
+        painter.drawPixmap(int(content.left()), int(content.top()), pixmap)
+        painter.setFont(self.name_font)
+        painter.setPen(NAME_COLOR)
+        name_rect = QRectF(text_left, content.top(), text_width, ICON_SIZE)
+        name = painter.fontMetrics().elidedText(
+            task.name, Qt.TextElideMode.ElideRight, int(name_rect.width()))
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, name)
+
+        # 截止日期
+        painter.setFont(self.deadline_font)
+        painter.setPen(DEADLINE_COLOR)
+        deadline_rect = QRectF(text_left, content.top() + ICON_SIZE + 8, text_width, 20)
+        painter.drawText(deadline_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                         f"⏰ {task.deadline}")
+
+        self._paint_progress(painter, task, QRectF(
+            content.right() - PROGRESS_WIDTH, content.top(), PROGRESS_WIDTH, PROGRESS_HEIGHT))
+        painter.restore()
+
+    def _paint_card(self, painter, option, card):
+        hovered = option.state & QStyle.StateFlag.State_MouseOver
+        if option.state & QStyle.StateFlag.State_Selected:
+            background = CARD_SELECTED
+        elif hovered:
+            background = CARD_HOVER
+        else:
+            background = CARD_BACKGROUND
+        painter.setPen(QPen(CARD_BORDER_HOVER if hovered else CARD_BORDER, 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(card, 8, 8)
+
+    def _paint_progress(self, painter, task, bar):
+        radius = PROGRESS_HEIGHT / 2
+        painter.setPen(QPen(CARD_BORDER, 1))
+        painter.setBrush(PROGRESS_BACKGROUND)
+        painter.drawRoundedRect(bar, radius, radius)
+
+        progress = max(0, min(task.progress or 0, 100))
+        if progress:
+            chunk = QRectF(bar)
+            chunk.setWidth(max(PROGRESS_HEIGHT, bar.width() * progress / 100))
+            painter.setPen(QPen(PROGRESS_CHUNK_BORDER, 1))
+            painter.setBrush(PROGRESS_CHUNK)
+            painter.drawRoundedRect(chunk, radius, radius)
+
+        painter.setPen(PROGRESS_TEXT_COLOR)
+        painter.setFont(self.progress_font)
+        painter.drawText(bar, Qt.AlignmentFlag.AlignCenter, f"{progress}%")
+
+        label = f"进度：{progress}%"
+        if task.subtask_total:
+            label += f"（子任务 {task.subtask_done}/{task.subtask_total}）"
+        painter.setFont(self.progress_text_font)
+        label_rect = QRectF(bar.left(), bar.bottom() + 6, bar.width(), 20)
+        label = painter.fontMetrics().elidedText(
+            label, Qt.TextElideMode.ElideRight, int(label_rect.width()))
+        painter.drawText(label_rect, Qt.AlignmentFlag.AlignCenter, label)
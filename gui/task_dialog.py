@@ -3,14 +3,14 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit,
 from PyQt6.QtCore import Qt, QDate
 
 class TaskDialog(QDialog):
-    def __init__(self, parent=None, edit_mode=False, task_data=None):
+    def __init__(self, parent=None, edit_mode=False, task=None):
         super().__init__(parent)
         self.edit_mode = edit_mode
-        self.task_data = task_data
+        self.task = task
         self.setWindowTitle("编辑任务" if edit_mode else "添加新任务")
         self.setup_ui()
         
-        if edit_mode and task_data:
+        if edit_mode and task:
             self.load_task_data()
     
     def setup_ui(self):
@@ -54,11 +54,11 @@ class TaskDialog(QDialog):
     
     def load_task_data(self):
         """加载现有任务数据"""
-        self.name_edit.setText(self.task_data['name'])
-        index = self.priority_combo.findText(self.task_data['priority'])
+        self.name_edit.setText(self.task.name)
+        index = self.priority_combo.findText(self.task.priority)
         if (index >= 0):
             self.priority_combo.setCurrentIndex(index)
-        self.date_edit.setDate(QDate.fromString(self.task_data['deadline'], 
+        self.date_edit.setDate(QDate.fromString(self.task.deadline, 
                                                "yyyy-MM-dd"))
 
     def get_task_data(self):
@@ -68,7 +68,7 @@ class TaskDialog(QDialog):
             "deadline": self.date_edit.date().toString("yyyy-MM-dd")
         }
         if self.edit_mode:
-            data['id'] = self.task_data['id']
+            data['id'] = self.task.id
         return data
 
     def accept(self):
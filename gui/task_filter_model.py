@@ -0,0 +1,265 @@
+from bisect import bisect_left
+from datetime import datetime, timezone
+import time
+
+from PyQt6.QtCore import QAbstractProxyModel, QModelIndex
+
+# 优先级只在建立排序键时换算一次，比较时直接比较整数
+PRIORITY_RANKS = {"高": 0, "中": 1, "低": 2}
+UNKNOWN_PRIORITY_RANK = len(PRIORITY_RANKS)
+
+# 排序方式：名称 -> 显示文字（README 中的默认排序为优先级）
+SORT_MODES = {
+    "priority": "优先级",
+    "created": "添加时间",
+    "recent": "最近使用",
+    "alphabetical": "字母顺序",
+}
+
+
+def _timestamp(text):
+    """把 SQLite 的 UTC 时间文本转换为秒数，无法解析时为 0"""
+    if not text:
+        return 0.0
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class _Entry:
+    """一个任务的缓存：搜索用的小写文本与每种排序方式的排序键"""
+    __slots__ = ('task', 'haystack', 'keys')
+
+    def __init__(self, task, used_at=0.0):
+        self.task = task
+        self.haystack = f"{task.name}\n{task.tags or ''}".casefold()
+        created = _timestamp(task.created_at)
+        used = max(created, _timestamp(task.completed_at), used_at)
+        # 所有键都按升序排列，最后一项 -id 保证键唯一，也可以从键还原任务 ID
+        tail = (-created, -task.id)
+        self.keys = {
+            "priority": (PRIORITY_RANKS.get(task.priority, UNKNOWN_PRIORITY_RANK),) + tail,
+            "created": tail,
+            "recent": (-used,) + tail,
+            "alphabetical": (task.name.casefold(),) + tail,
+        }
+
+
+class TaskSortFilterModel(QAbstractProxyModel):
+    """TaskListModel 之上的客户端筛选与排序层
+
+    每个任务的排序键在载入或修改时按全部排序方式预先算好，切换排序方式时
+    只需重新排列已缓存的键，不再查询 SQLite，也不会重建列表。
+    可见行保存为按当前排序键升序排列的列表，单个任务的插入、删除和修改
+    通过二分查找定位，只影响对应的一行。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._sort_mode = "priority"
+        self._terms = []
+        self._entries = {}
+        # 最近使用时间只在本次运行中记录
+        self._used_at = {}
+        # 当前可见任务的排序键，升序排列
+        self._keys = []
+
+    # ---- 对外接口 ----
+
+    def setSourceModel(self, model):
+        previous = self.sourceModel()
+        if previous is not None:
+            previous.modelReset.disconnect(self._on_source_reset)
+            previous.rowsInserted.disconnect(self._on_rows_inserted)
+            previous.rowsAboutToBeRemoved.disconnect(self._on_rows_about_to_be_removed)
+            previous.dataChanged.disconnect(self._on_data_changed)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.modelReset.connect(self._on_source_reset)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        model.dataChanged.connect(self._on_data_changed)
+        self._reload()
+        self.endResetModel()
+
+    @property
+    def sort_mode(self):
+        return self._sort_mode
+
+    def set_sort_mode(self, mode):
+        """切换排序方式（SORT_MODES 中的键），只重新排列缓存的排序键"""
+        if mode not in SORT_MODES:
+            raise ValueError(f"未知的排序方式: {mode}")
+        if mode != self._sort_mode:
+            self._sort_mode = mode
+            self._relayout()
+
+    def set_filter_text(self, text):
+        """按关键词筛选名称与标签，多个关键词之间为“与”关系"""
+        terms = text.casefold().split()
+        if terms != self._terms:
+            self._terms = terms
+            self._relayout()
+
+    def mark_used(self, task_id):
+        """记录任务刚被使用过，影响“最近使用”排序"""
+        self._used_at[task_id] = time.time()
+        entry = self._entries.get(task_id)
+        if entry is not None:
+            self._update_task(entry.task)
+
+    def task_at(self, row):
+        return self._entries[-self._keys[row][-1]].task
+
+    def row_of(self, task_id):
+        """任务在筛选排序后的行号，不可见时返回 None"""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        return self._find(entry.keys[self._sort_mode])
+
+    # ---- QAbstractProxyModel ----
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._keys):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        source = self.sourceModel()
+        if source is None or not proxy_index.isValid():
+            return QModelIndex()
+        row = source.row_of(-self._keys[proxy_index.row()][-1])
+        return QModelIndex() if row is None else source.index(row)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.row_of(self.sourceModel().task_at(source_index.row()).id)
+        return QModelIndex() if row is None else self.index(row)
+
+    # ---- 内部实现 ----
+
+    def _entry(self, task):
+        """取得任务的缓存，任务记录未变化时直接复用"""
+        entry = self._entries.get(task.id)
+        if entry is None or entry.task is not task:
+            entry = _Entry(task, self._used_at.get(task.id, 0.0))
+            self._entries[task.id] = entry
+        return entry
+
+    def _matches(self, entry):
+        return all(term in entry.haystack for term in self._terms)
+
+    def _find(self, key):
+        row = bisect_left(self._keys, key)
+        if row < len(self._keys) and self._keys[row] == key:
+            return row
+        return None
+
+    def _reload(self):
+        """从源模型重新读取全部任务，未变化的任务沿用已有缓存"""
+        source = self.sourceModel()
+        tasks = [source.task_at(row) for row in range(source.rowCount())] if source else []
+        # 同时丢弃已不在源模型中的任务缓存
+        self._entries = {task.id: self._entry(task) for task in tasks}
+        self._rebuild()
+
+    def _rebuild(self):
+        entries = self._entries.values()
+        # 每个关键词依次缩小候选范围
+        for term in self._terms:
+            entries = [entry for entry in entries if term in entry.haystack]
+        mode = self._sort_mode
+        keys = [entry.keys[mode] for entry in entries]
+        keys.sort()
+        self._keys = keys
+
+    def _relayout(self):
+        """重新筛选和排序，保持选中项等持久索引指向原来的任务"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        task_ids = [-self._keys[index.row()][-1] for index in persistent]
+        self._rebuild()
+        rows = [self.row_of(task_id) for task_id in task_ids]
+        self.changePersistentIndexList(
+            persistent, [QModelIndex() if row is None else self.index(row) for row in rows])
+        self.layoutChanged.emit()
+
+    def _on_source_reset(self):
+        self.beginResetModel()
+        self._reload()
+        self.endResetModel()
+
+    def _on_rows_inserted(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            entry = self._entry(source.task_at(row))
+            if self._matches(entry):
+                self._insert_key(entry.keys[self._sort_mode])
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            entry = self._entries.pop(source.task_at(row).id, None)
+            if entry is not None:
+                self._remove_row(self._find(entry.keys[self._sort_mode]))
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        source = self.sourceModel()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._update_task(source.task_at(row))
+
+    def _update_task(self, task):
+        """任务内容变化：按需要插入、删除、移动或只重绘对应的行"""
+        old = self._entries.get(task.id)
+        old_row = self._find(old.keys[self._sort_mode]) if old is not None else None
+        self._entries.pop(task.id, None)
+        entry = self._entry(task)
+        key = entry.keys[self._sort_mode]
+        visible = self._matches(entry)
+
+        if old_row is None:
+            if visible:
+                self._insert_key(key)
+            return
+        if not visible:
+            self._remove_row(old_row)
+            return
+        old_key = self._keys.pop(old_row)
+        new_row = bisect_left(self._keys, key)
+        if new_row != old_row:
+            self._keys.insert(old_row, old_key)
+            # beginMoveRows 的目标行按移动前的行号计算
+            destination = new_row + 1 if new_row > old_row else new_row
+            self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), destination)
+            del self._keys[old_row]
+            self._keys.insert(new_row, key)
+            self.endMoveRows()
+        else:
+            self._keys.insert(old_row, key)
+        index = self.index(new_row)
+        self.dataChanged.emit(index, index)
+
+    def _insert_key(self, key):
+        row = bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self.endInsertRows()
+
+    def _remove_row(self, row):
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        self.endRemoveRows()
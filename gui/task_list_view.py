@@ -0,0 +1,25 @@
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+
+
+class TaskListView(QTableView):
+    """任务列表视图：只有一列、隐藏表头的 QTableView，所有行高度相同
+
+    QListView 在插入或删除一行后会重新布局全部行，每行调用两次模型的 index()，
+    任务越多越慢（50000 个任务时每次添加或删除约 300 毫秒）。
+    QTableView 的行位置由垂直表头按固定行高计算，不需要逐行访问模型，
+    插入、删除与单行修改都只重绘受影响的区域。
+    """
+
+    def __init__(self, row_height, parent=None):
+        super().__init__(parent)
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        vertical = self.verticalHeader()
+        vertical.hide()
+        vertical.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical.setMinimumSectionSize(0)
+        vertical.setDefaultSectionSize(row_height)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setCornerButtonEnabled(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -0,0 +1,84 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class TaskListModel(QAbstractListModel):
+    """任务列表模型，每行保存一个 Task 记录，由 TaskItemDelegate 负责绘制"""
+
+    TaskIdRole = Qt.ItemDataRole.UserRole
+    TaskRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = []
+        # 任务 ID -> 行号，整体替换后在第一次查找时建立，插入或删除行时就地修补
+        self._rows = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        if role == self.TaskRole:
+            return task
+        if role == self.TaskIdRole:
+            return task.id
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{task.name}\n截止日期：{task.deadline}"
+        return None
+
+    def set_tasks(self, tasks):
+        """整体替换列表内容"""
+        self.beginResetModel()
+        self._tasks = list(tasks)
+        self._rows = None
+        self.endResetModel()
+
+    def task_at(self, row):
+        return self._tasks[row]
+
+    def row_of(self, task_id):
+        """返回任务所在的行号，不在列表中时返回 None"""
+        if self._rows is None:
+            self._rows = {task.id: row for row, task in enumerate(self._tasks)}
+        return self._rows.get(task_id)
+
+    def insert_task(self, row, task):
+        """在指定行插入一个任务"""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._tasks.insert(row, task)
+        # 追加到末尾（新任务的常见情况）时只需记录一项
+        self._renumber(row)
+        self.endInsertRows()
+
+    def update_task(self, task):
+        """替换已有任务的数据，只通知该行重绘"""
+        row = self.row_of(task.id)
+        if row is None:
+            return False
+        self._tasks[row] = task
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def remove_task(self, task_id):
+        """删除任务所在的行"""
+        row = self.row_of(task_id)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._tasks[row]
+        if self._rows is not None:
+            del self._rows[task_id]
+        self._renumber(row)
+        self.endRemoveRows()
+        return True
+
+    def _renumber(self, first):
+        """更新 first 及之后各行的行号"""
+        if self._rows is not None:
+            for row in range(first, len(self._tasks)):
+                self._rows[self._tasks[row].id] = row
@@ -1,8 +1,12 @@
 import sys
+from gui.startup import StartupProfiler
+
+# 传入 --startup-report 时统计各模块的导入时间与首个窗口的显示时间
+profiler = StartupProfiler().install() if "--startup-report" in sys.argv else None
+
 from PyQt6.QtWidgets import QApplication
 from gui.main_window import MainWindow
 from models.database import Database
-from sync.webdav_sync import WebDAVSync
 
 def main():
     # 初始化数据库
@@ -13,6 +17,8 @@ def main():
     
     # 创建主窗口，传入数据库实例
     window = MainWindow(db)
+    if profiler is not None:
+        profiler.watch_first_show(window)
     window.show()
     
     # 启动应用
@@ -1,252 +1,1517 @@
 import sqlite3
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+import gzip
 import json
+import uuid
+
+from .task import (Task, TASK_COLUMNS, SUBTASK_COLUMNS, SUBTASK_DONE,
+                   task_row_factory, subtask_row_factory)
+
+
+def _migrate_create_tables(cursor):
+    """1: 建表，并为旧版本数据库补齐同步相关的字段"""
+    # 创建任务表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        priority TEXT,
+        deadline TEXT,
+        progress INTEGER DEFAULT 0,
+        tags TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_sync_time TEXT,
+        sync_status TEXT DEFAULT 'pending',
+        sync_version INTEGER DEFAULT 0
+    )
+    ''')
+
+    # 创建子任务表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS subtasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        name TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        target_time INTEGER,
+        completed_time INTEGER DEFAULT 0,
+        sync_version INTEGER DEFAULT 0,
+        FOREIGN KEY (task_id) REFERENCES tasks (id)
+    )
+    ''')
+
+    # 创建同步日志表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sync_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        sync_time TEXT DEFAULT CURRENT_TIMESTAMP,
+        sync_status TEXT,
+        sync_message TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks (id)
+    )
+    ''')
+
+    # 早期版本创建的表缺少同步字段，CREATE TABLE IF NOT EXISTS 不会补齐
+    _add_missing_columns(cursor, 'tasks', {
+        'last_sync_time': 'TEXT',
+        'sync_status': "TEXT DEFAULT 'pending'",
+        'sync_version': 'INTEGER DEFAULT 0',
+    })
+    _add_missing_columns(cursor, 'subtasks', {
+        'sync_version': 'INTEGER DEFAULT 0',
+    })
+
+
+def _add_missing_columns(cursor, table, columns):
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+
+def _migrate_hot_query_indexes(cursor):
+    """2: 为常用查询建立索引，避免全表扫描"""
+    # 任务列表 ORDER BY created_at DESC，id 用于区分相同的创建时间
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at, id)')
+    # 未同步任务 WHERE sync_status = 'pending' ORDER BY created_at DESC
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tasks_sync_status
+    ON tasks (sync_status, created_at, id)
+    ''')
+    # 删除任务时的 DELETE FROM subtasks / sync_logs WHERE task_id = ?
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_subtasks_task ON subtasks (task_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_logs_task ON sync_logs (task_id)')
+    # 统计同步错误 WHERE sync_status = "error"，只需读取索引即可完成 COUNT(*)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_logs_status ON sync_logs (sync_status)')
+
+
+# 统计面板使用的计数器及其对应的任务条件，{row} 为 NEW 或 OLD
+TASK_COUNTER_CONDITIONS = {
+    'total': '1',
+    'completed': '{row}.progress = 100',
+    'in_progress': '{row}.progress > 0 AND {row}.progress < 100',
+    'pending': '{row}.progress = 0',
+    'synced': "{row}.sync_status = 'synced'",
+    'pending_sync': "{row}.sync_status = 'pending'",
+}
+TASK_COUNTERS = list(TASK_COUNTER_CONDITIONS) + ['sync_errors']
+
+# 单次扫描得到全部统计数据，作为计数器的初始值与一致性校验
+TASK_STATISTICS_SQL = 'SELECT {}, ({}) FROM tasks'.format(
+    ', '.join(f"COUNT(CASE WHEN {condition.format(row='tasks')} THEN 1 END)"
+              for condition in TASK_COUNTER_CONDITIONS.values()),
+    "SELECT COUNT(*) FROM sync_logs WHERE sync_status = 'error'")
+
+
+def _task_counter_delta(row):
+    """生成按计数器名称计算增量的 CASE 表达式"""
+    cases = ' '.join(f"WHEN '{name}' THEN IFNULL({condition.format(row=row)}, 0)"
+                     for name, condition in TASK_COUNTER_CONDITIONS.items())
+    return f'CASE name {cases} ELSE 0 END'
+
+
+def _reset_task_counters(cursor, stats):
+    cursor.execute('DELETE FROM task_counters')
+    cursor.executemany('INSERT INTO task_counters (name, value) VALUES (?, ?)',
+                       stats.items())
+
+
+def _migrate_task_counters(cursor):
+    """3: 由触发器增量维护的统计计数器，统计面板无需再扫描全表"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS task_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''')
+    stats = dict(zip(TASK_COUNTERS, cursor.execute(TASK_STATISTICS_SQL).fetchone()))
+    _reset_task_counters(cursor, stats)
+
+    task_counters = ', '.join(f"'{name}'" for name in TASK_COUNTER_CONDITIONS)
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_counters_insert AFTER INSERT ON tasks
+    BEGIN
+        UPDATE task_counters SET value = value + {_task_counter_delta('NEW')}
+        WHERE name IN ({task_counters});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_counters_delete AFTER DELETE ON tasks
+    BEGIN
+        UPDATE task_counters SET value = value - {_task_counter_delta('OLD')}
+        WHERE name IN ({task_counters});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_counters_update
+    AFTER UPDATE OF progress, sync_status ON tasks
+    BEGIN
+        UPDATE task_counters
+        SET value = value + {_task_counter_delta('NEW')} - {_task_counter_delta('OLD')}
+        WHERE name IN ({task_counters});
+    END
+    ''')
+
+    # 同步错误数由 sync_logs 上的触发器维护
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS sync_logs_counters_insert AFTER INSERT ON sync_logs
+    WHEN NEW.sync_status = 'error'
+    BEGIN
+        UPDATE task_counters SET value = value + 1 WHERE name = 'sync_errors';
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS sync_logs_counters_delete AFTER DELETE ON sync_logs
+    WHEN OLD.sync_status = 'error'
+    BEGIN
+        UPDATE task_counters SET value = value - 1 WHERE name = 'sync_errors';
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS sync_logs_counters_update
+    AFTER UPDATE OF sync_status ON sync_logs
+    BEGIN
+        UPDATE task_counters
+        SET value = value + IFNULL(NEW.sync_status = 'error', 0)
+                          - IFNULL(OLD.sync_status = 'error', 0)
+        WHERE name = 'sync_errors';
+    END
+    ''')
+
+
+def _migrate_task_search_index(cursor):
+    """4: 任务名称与标签的 FTS5 全文检索索引，由触发器保持与 tasks 同步"""
+    try:
+        # trigram 分词按连续三个字符建立索引，不依赖空格分词，适用于中文任务名
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            name, tags,
+            content='tasks', content_rowid='id',
+            tokenize='trigram'
+        )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite 未编译 FTS5 或低于 3.34 不支持 trigram，search_tasks 会退回 LIKE 查询
+        print(f"全文检索不可用: {str(e)}")
+        return
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO tasks_fts (rowid, name, tags) VALUES (NEW.id, NEW.name, NEW.tags);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, name, tags)
+        VALUES ('delete', OLD.id, OLD.name, OLD.tags);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, tags ON tasks
+    BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, name, tags)
+        VALUES ('delete', OLD.id, OLD.name, OLD.tags);
+        INSERT INTO tasks_fts (rowid, name, tags) VALUES (NEW.id, NEW.name, NEW.tags);
+    END
+    ''')
+    cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def _migrate_deadline_day(cursor):
+    """5: 截止日期的规范化形式（距 1970-01-01 的天数）及其索引"""
+    # 虚拟生成列由 deadline 自动计算，无法解析的日期为 NULL
+    _add_missing_columns(cursor, 'tasks', {
+        'deadline_day': 'INTEGER GENERATED ALWAYS AS '
+                        '(CAST(julianday(deadline) - 2440587.5 AS INTEGER)) VIRTUAL',
+    })
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_deadline_day ON tasks (deadline_day)')
+    # 逾期查询只关心未完成的任务，部分索引体积更小
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tasks_open_deadline_day
+    ON tasks (deadline_day) WHERE progress < 100
+    ''')
+
+
+def _subtask_rollup(task_id, total_delta, done_delta):
+    """生成按增量调整任务子任务计数并重算进度的语句（SET 右侧读取的是更新前的值）"""
+    total = f'(subtask_total + {total_delta})'
+    done = f'(subtask_done + {done_delta})'
+    return f'''
+        UPDATE tasks
+        SET subtask_total = {total},
+            subtask_done = {done},
+            progress = CASE WHEN {total} > 0 THEN {done} * 100 / {total} ELSE progress END
+        WHERE id = {task_id};'''
+
+
+def _migrate_subtask_rollup(cursor):
+    """6: 任务上保存子任务总数与完成数，由触发器增量维护并同步更新进度"""
+    _add_missing_columns(cursor, 'tasks', {
+        'subtask_total': 'INTEGER NOT NULL DEFAULT 0',
+        'subtask_done': 'INTEGER NOT NULL DEFAULT 0',
+    })
+    cursor.execute(f'''
+    UPDATE tasks SET
+        subtask_total = (SELECT COUNT(*) FROM subtasks WHERE task_id = tasks.id),
+        subtask_done = (SELECT COUNT(*) FROM subtasks
+                        WHERE task_id = tasks.id AND status = '{SUBTASK_DONE}')
+    WHERE id IN (SELECT task_id FROM subtasks)
+    ''')
+    cursor.execute('''
+    UPDATE tasks SET progress = subtask_done * 100 / subtask_total
+    WHERE subtask_total > 0
+    ''')
+
+    new_done = f"IFNULL(NEW.status = '{SUBTASK_DONE}', 0)"
+    old_done = f"IFNULL(OLD.status = '{SUBTASK_DONE}', 0)"
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS subtasks_rollup_insert AFTER INSERT ON subtasks
+    BEGIN {_subtask_rollup('NEW.task_id', 1, new_done)}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS subtasks_rollup_delete AFTER DELETE ON subtasks
+    BEGIN {_subtask_rollup('OLD.task_id', -1, f'-{old_done}')}
+    END
+    ''')
+    # 子任务被移动到其他任务时，相当于从旧任务删除再添加到新任务
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS subtasks_rollup_update
+    AFTER UPDATE OF status, task_id ON subtasks
+    BEGIN {_subtask_rollup('OLD.task_id', -1, f'-{old_done}')}
+        {_subtask_rollup('NEW.task_id', 1, new_done)}
+    END
+    ''')
+
+
+# UTC 时间戳（CURRENT_TIMESTAMP 写入的 completed_at）换算为与 epoch_day() 相同的本地日期天数，
+# 才能与本地日期 deadline_day 以及 date.today() 比较
+_LOCAL_EPOCH_DAY_SQL = "CAST(julianday({}, 'localtime') - 2440587.5 AS INTEGER)"
+
+
+def _completion_rollup(row, sign):
+    """生成把一行任务计入（sign 为 +）或移出（sign 为 -）每日汇总表的语句
+
+    completion_daily 按完成日期记录完成数与完成用时（秒）之和；
+    deadline_daily 按截止日期记录到期任务数与按时完成数。
+    早期版本完成的任务没有 completed_at，视为按时完成但不计入完成时间序列。
+    """
+    completed_day = _LOCAL_EPOCH_DAY_SQL.format(f'{row}.completed_at')
+    seconds = f"IFNULL((julianday({row}.completed_at) - julianday({row}.created_at)) * 86400, 0)"
+    met = (f"({row}.progress = 100 AND ({row}.completed_at IS NULL "
+           f"OR {completed_day} <= {row}.deadline_day))")
+    return f'''
+        INSERT INTO completion_daily (day, completed, completion_seconds)
+        SELECT {completed_day}, {sign}1, {sign}{seconds}
+        WHERE {row}.completed_at IS NOT NULL
+        ON CONFLICT (day) DO UPDATE SET
+            completed = completed + excluded.completed,
+            completion_seconds = completion_seconds + excluded.completion_seconds;
+        INSERT INTO deadline_daily (day, due, met)
+        SELECT {row}.deadline_day, {sign}1, {sign}{met}
+        WHERE {row}.deadline_day IS NOT NULL
+        ON CONFLICT (day) DO UPDATE SET
+            due = due + excluded.due,
+            met = met + excluded.met;'''
+
+
+def _migrate_completion_rollups(cursor):
+    """7: 任务完成时间 completed_at 以及按天预先汇总的完成/到期统计表"""
+    _add_missing_columns(cursor, 'tasks', {'completed_at': 'TEXT'})
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS completion_daily (
+        day INTEGER PRIMARY KEY,
+        completed INTEGER NOT NULL DEFAULT 0,
+        completion_seconds REAL NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS deadline_daily (
+        day INTEGER PRIMARY KEY,
+        due INTEGER NOT NULL DEFAULT 0,
+        met INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+
+    # 进度变为 100 时记录完成时间，离开 100 时清除；已显式给出完成时间的写入保持不变
+    stamp = '''
+        UPDATE tasks
+        SET completed_at = CASE WHEN NEW.progress = 100 THEN CURRENT_TIMESTAMP END
+        WHERE id = NEW.id;'''
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at_insert AFTER INSERT ON tasks
+    WHEN NEW.progress = 100 AND NEW.completed_at IS NULL
+    BEGIN {stamp}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at_update AFTER UPDATE OF progress ON tasks
+    WHEN (NEW.progress = 100 AND OLD.progress IS NOT 100 AND NEW.completed_at IS NULL)
+      OR (NEW.progress < 100 AND NEW.completed_at IS NOT NULL)
+    BEGIN {stamp}
+    END
+    ''')
+
+    _create_completion_rollup_triggers(cursor)
+    _rebuild_completion_rollups(cursor)
+
+
+def _create_completion_rollup_triggers(cursor):
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_rollup_insert AFTER INSERT ON tasks
+    BEGIN {_completion_rollup('NEW', '+')}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_rollup_delete AFTER DELETE ON tasks
+    BEGIN {_completion_rollup('OLD', '-')}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_rollup_update
+    AFTER UPDATE OF progress, completed_at, deadline, created_at ON tasks
+    BEGIN {_completion_rollup('OLD', '-')}
+        {_completion_rollup('NEW', '+')}
+    END
+    ''')
+
+
+def _rebuild_completion_rollups(cursor):
+    """用一次聚合查询重建每日汇总表"""
+    completed_day = _LOCAL_EPOCH_DAY_SQL.format('completed_at')
+    cursor.execute('DELETE FROM completion_daily')
+    cursor.execute('DELETE FROM deadline_daily')
+    cursor.execute(f'''
+    INSERT INTO completion_daily (day, completed, completion_seconds)
+    SELECT {completed_day}, COUNT(*),
+           SUM(IFNULL((julianday(completed_at) - julianday(created_at)) * 86400, 0))
+    FROM tasks WHERE completed_at IS NOT NULL
+    GROUP BY 1
+    ''')
+    cursor.execute(f'''
+    INSERT INTO deadline_daily (day, due, met)
+    SELECT deadline_day, COUNT(*),
+           SUM(progress = 100 AND (completed_at IS NULL OR {completed_day} <= deadline_day))
+    FROM tasks WHERE deadline_day IS NOT NULL
+    GROUP BY 1
+    ''')
+
+
+def _migrate_pomodoro_sessions(cursor):
+    """8: 番茄钟完成的专注时段"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS pomodoro_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        started_at TEXT NOT NULL,
+        ended_at TEXT NOT NULL,
+        duration INTEGER NOT NULL,
+        FOREIGN KEY (task_id) REFERENCES tasks (id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_pomodoro_sessions_ended
+    ON pomodoro_sessions (ended_at)
+    ''')
+
+
+# 毫秒精度的 UTC 时间，用于比较同一任务在不同设备上的修改先后
+_NOW_MS_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+_NEW_UID_SQL = 'lower(hex(randomblob(16)))'
+# 本地修改后需要同步的任务字段，子任务随所属任务一起同步
+SYNC_TASK_FIELDS = ('name', 'priority', 'deadline', 'progress', 'tags')
+# 同步批次中一个任务的字段顺序（之后是子任务列表），以及子任务的字段顺序
+SYNC_RECORD_FIELDS = ('uid',) + SYNC_TASK_FIELDS + ('created_at', 'completed_at', 'modified_at')
+SYNC_SUBTASK_FIELDS = ('name', 'status', 'target_time', 'completed_time')
+SYNC_RECORD_COLUMNS = ', '.join(SYNC_RECORD_FIELDS)
+# 应用远程修改时写入的字段，缺少创建时间的记录使用当前时间
+_SYNC_ASSIGNMENTS = ', '.join(
+    f'{name} = IFNULL(?, CURRENT_TIMESTAMP)' if name == 'created_at' else f'{name} = ?'
+    for name in SYNC_RECORD_FIELDS[1:])
+
+
+def _migrate_delta_sync(cursor):
+    """9: 增量同步所需的全局任务标识、修改时间、删除记录与同步进度
+
+    uid 在所有设备上标识同一个任务；modified_at 为最后一次修改的时间。
+    sync_version 只在与服务器交换数据时递增（上传确认或应用远程修改），
+    因此 sync_version 不变的修改就是本地修改，由触发器把任务标记为待同步。
+    """
+    _add_missing_columns(cursor, 'tasks', {'uid': 'TEXT', 'modified_at': 'TEXT'})
+    cursor.execute(f'''
+    UPDATE tasks SET uid = {_NEW_UID_SQL},
+                     modified_at = IFNULL(created_at, {_NOW_MS_SQL})
+    WHERE uid IS NULL
+    ''')
+    # 旧版本整库上传的数据在服务器上没有对应的增量记录，首次增量同步时全部上传
+    cursor.execute("UPDATE tasks SET sync_status = 'pending' WHERE sync_status IS NOT 'pending'")
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_uid ON tasks (uid)')
+
+    # 已同步过的任务被删除后，需要把删除同步到其他设备
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sync_tombstones (
+        uid TEXT PRIMARY KEY,
+        deleted_at TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    # 本设备标识、下一个批次编号等同步状态
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sync_state (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    ) WITHOUT ROWID
+    ''')
+    # 每台其他设备已应用到的批次编号
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sync_peers (
+        device TEXT PRIMARY KEY,
+        last_batch INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+
+    # add_task/add_tasks 在插入时直接给出 uid 与 modified_at，其他插入由触发器补齐
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_sync_identity AFTER INSERT ON tasks
+    WHEN NEW.uid IS NULL OR NEW.modified_at IS NULL
+    BEGIN
+        UPDATE tasks SET uid = IFNULL(NEW.uid, {_NEW_UID_SQL}),
+                         modified_at = IFNULL(NEW.modified_at, {_NOW_MS_SQL})
+        WHERE id = NEW.id;
+    END
+    ''')
+    mark_pending = f'''
+        UPDATE tasks SET sync_status = 'pending', modified_at = {_NOW_MS_SQL}
+        WHERE id = {{}};'''
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_sync_pending
+    AFTER UPDATE OF {', '.join(SYNC_TASK_FIELDS)} ON tasks
+    WHEN NEW.sync_version = OLD.sync_version
+    BEGIN {mark_pending.format('NEW.id')}
+    END
+    ''')
+    # 子任务的增删与状态变化会通过进度汇总更新任务，这里补上其余字段的修改
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS subtasks_sync_pending
+    AFTER UPDATE OF name, target_time, completed_time ON subtasks
+    BEGIN {mark_pending.format('NEW.task_id')}
+    END
+    ''')
+    # 从未上传过的任务（sync_version 为 0）服务器上没有记录，删除时无需同步
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_sync_tombstone AFTER DELETE ON tasks
+    WHEN OLD.uid IS NOT NULL AND OLD.sync_version > 0
+    BEGIN
+        INSERT OR REPLACE INTO sync_tombstones (uid, deleted_at) VALUES (OLD.uid, {_NOW_MS_SQL});
+    END
+    ''')
+
+
+def _migrate_sync_origin(cursor):
+    """10: 记录每个任务与删除记录最后一次修改来自哪台设备
+
+    应用远程批次时用 (修改时间, 来源设备) 与本地记录比较，只接受更新的修改，
+    时间相同时各设备按同一个设备标识决出先后。origin 为 NULL 表示本设备；
+    删除记录的 origin 为 NULL 表示尚未上传，上传后写入本设备标识。
+    其他设备的删除也保留删除记录，之后到达的较旧修改不会让任务重新出现。
+    """
+    _add_missing_columns(cursor, 'tasks', {'origin': 'TEXT'})
+    _add_missing_columns(cursor, 'sync_tombstones', {'origin': 'TEXT'})
+    # 本地修改由触发器标记为待同步，同时把来源改回本设备
+    mark_pending = f'''
+        UPDATE tasks SET sync_status = 'pending', modified_at = {_NOW_MS_SQL}, origin = NULL
+        WHERE id = {{}};'''
+    cursor.execute('DROP TRIGGER IF EXISTS tasks_sync_pending')
+    cursor.execute(f'''
+    CREATE TRIGGER tasks_sync_pending
+    AFTER UPDATE OF {', '.join(SYNC_TASK_FIELDS)} ON tasks
+    WHEN NEW.sync_version = OLD.sync_version
+    BEGIN {mark_pending.format('NEW.id')}
+    END
+    ''')
+    cursor.execute('DROP TRIGGER IF EXISTS subtasks_sync_pending')
+    cursor.execute(f'''
+    CREATE TRIGGER subtasks_sync_pending
+    AFTER UPDATE OF name, target_time, completed_time ON subtasks
+    BEGIN {mark_pending.format('NEW.task_id')}
+    END
+    ''')
+    # tasks_sync_tombstone 的 INSERT OR REPLACE 写入的删除记录 origin 为 NULL，即待上传
+
+def _migrate_local_completion_day(cursor):
+    """11: 每日汇总按本地日期计入完成时间，重建触发器与已有的汇总数据
+
+    此前按 UTC 日期计入，与本地的截止日期比较时，本地凌晨完成的任务会被算作前一天完成。
+    """
+    for name in ('tasks_rollup_insert', 'tasks_rollup_delete', 'tasks_rollup_update'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    _create_completion_rollup_triggers(cursor)
+    _rebuild_completion_rollups(cursor)
+
+
+# 数据库结构迁移，按顺序执行；PRAGMA user_version 记录已执行到第几个
+MIGRATIONS = [
+    _migrate_create_tables,
+    _migrate_hot_query_indexes,
+    _migrate_task_counters,
+    _migrate_task_search_index,
+    _migrate_deadline_day,
+    _migrate_subtask_rollup,
+    _migrate_completion_rollups,
+    _migrate_pomodoro_sessions,
+    _migrate_delta_sync,
+    _migrate_sync_origin,
+    _migrate_local_completion_day,
+]
+
+
+DEFAULT_PAGE_SIZE = 500
+# 每个同步批次最多包含的任务或删除记录数
+SYNC_BATCH_SIZE = 500
+# 导入时每个事务写入的任务数
+IMPORT_CHUNK_SIZE = 1000
+
+# 导出的任务字典字段：id 为 uid，其余与同步记录相同，另有嵌套的 subtasks
+EXPORT_FIELDS = ('id',) + SYNC_RECORD_FIELDS[1:]
+
+# 按 uid 插入或更新任务；导入属于本地修改，修改时间取当前时间（更新时由触发器设置）
+_IMPORT_UPSERT_SQL = f'''
+INSERT INTO tasks (uid, name, priority, deadline, progress, tags,
+                   created_at, completed_at, modified_at)
+VALUES (?, ?, ?, ?, ?, ?, IFNULL(?, CURRENT_TIMESTAMP), ?, {_NOW_MS_SQL})
+ON CONFLICT (uid) DO UPDATE SET
+    name = excluded.name, priority = excluded.priority, deadline = excluded.deadline,
+    progress = excluded.progress, tags = excluded.tags, created_at = excluded.created_at,
+    completed_at = excluded.completed_at
+'''
+
+
+def _open_jsonl(path, mode):
+    """打开 JSON Lines 文件，.gz 结尾时透明地压缩或解压"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+# trigram 索引只能匹配不少于三个字符的关键词
+FTS_MIN_TERM_LENGTH = 3
+
+# 任务状态过滤条件，可直接拼接到 WHERE 子句中
+TASK_STATUS_FILTERS = {
+    'completed': 'progress = 100',
+    'in_progress': 'progress > 0 AND progress < 100',
+    'pending': 'progress = 0',
+}
+
+# 截止日期筛选：窗口名称 -> 相对今天的 (起始偏移, 结束偏移) 天数，None 表示到本周日
+DUE_WINDOWS = {
+    'today': (0, 0),
+    'tomorrow': (1, 1),
+    'week': (0, None),
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def epoch_day(day=None):
+    """把日期转换为与 deadline_day 相同的天数表示，默认为今天"""
+    return (day or date.today()).toordinal() - _EPOCH_ORDINAL
+
+
+def due_window_days(window, today=None):
+    """返回截止日期窗口对应的 (起始天, 结束天)，均包含在内"""
+    today = today or date.today()
+    start, end = DUE_WINDOWS[window]
+    if end is None:
+        end = 6 - today.weekday()
+    return epoch_day(today) + start, epoch_day(today) + end
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 
 class Database:
     def __init__(self, db_file="tasks.db"):
         self.db_file = db_file
+        # 每个线程持有一个长连接（GUI 线程与 WebDAV 同步线程各自独立）
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._search_index = None
+        self._sync_device = None
         self.init_database()
+
+    def _connect(self):
+        """打开新连接并设置 WAL 日志模式与性能相关的 PRAGMA"""
+        # isolation_level=None：由 transaction() 显式控制事务边界
+        conn = sqlite3.connect(self.db_file, timeout=10, check_same_thread=False,
+                               isolation_level=None)
+        # WAL 模式下读操作不会被同步线程的写操作阻塞
+        conn.execute('PRAGMA journal_mode = WAL')
+        # WAL 模式下 NORMAL 已能保证数据库一致性，且提交时无需每次 fsync
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -8000')
+        return conn
+
+    def _get_connection(self):
+        """获取当前线程的数据库连接，首次调用时创建"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """关闭所有线程打开的数据库连接"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        """工作单元：块内的所有数据库操作合并为一次原子提交
+
+        可以嵌套使用，内层通过 SAVEPOINT 实现，出错时只回滚内层的修改；
+        最外层退出时统一提交，出现异常则整体回滚。
+
+            with db.transaction():
+                db.update_sync_status(task_id, 'synced')
+                db.increment_sync_version(task_id)
+        """
+        conn = self._get_connection()
+        depth = getattr(self._local, 'depth', 0)
+        savepoint = f'sp_{depth}'
+        if depth == 0:
+            conn.execute('BEGIN IMMEDIATE')
+        else:
+            conn.execute(f'SAVEPOINT {savepoint}')
+        self._local.depth = depth + 1
+        try:
+            yield conn.cursor()
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f'ROLLBACK TO {savepoint}')
+                conn.execute(f'RELEASE {savepoint}')
+            raise
+        self._local.depth = depth
+        if depth == 0:
+            conn.commit()
+        else:
+            conn.execute(f'RELEASE {savepoint}')
     
     def init_database(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # 创建任务表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            priority TEXT,
-            deadline TEXT,
-            progress INTEGER DEFAULT 0,
-            tags TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            last_sync_time TEXT,
-            sync_status TEXT DEFAULT 'pending',
-            sync_version INTEGER DEFAULT 0
-        )
-        ''')
-        
-        # 创建子任务表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS subtasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER,
-            name TEXT NOT NULL,
-            status TEXT DEFAULT 'pending',
-            target_time INTEGER,
-            completed_time INTEGER DEFAULT 0,
-            sync_version INTEGER DEFAULT 0,
-            FOREIGN KEY (task_id) REFERENCES tasks (id)
-        )
-        ''')
-        
-        # 创建同步日志表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sync_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER,
-            sync_time TEXT DEFAULT CURRENT_TIMESTAMP,
-            sync_status TEXT,
-            sync_message TEXT,
-            FOREIGN KEY (task_id) REFERENCES tasks (id)
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        """执行尚未应用的结构迁移，已是最新版本时只需读取一次 user_version"""
+        conn = self._get_connection()
+        if self._schema_version(conn) >= len(MIGRATIONS):
+            return
+        with self.transaction() as cursor:
+            # 获得写锁后重新读取，避免与其他进程重复迁移
+            version = self._schema_version(conn)
+            for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+                migration(cursor)
+                cursor.execute(f'PRAGMA user_version = {number}')
+                print(f"数据库结构已升级到版本 {number}")
+
+    @staticmethod
+    def _schema_version(conn):
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
     def add_task(self, task_data):
         """添加新任务"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            INSERT INTO tasks (name, priority, deadline, tags)
-            VALUES (?, ?, ?, ?)
-            ''', (task_data["name"].strip(), 
-                  task_data["priority"], 
-                  task_data["deadline"],
-                  task_data.get("tags", "")))
-            
-            task_id = cursor.lastrowid
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute(f'''
+                INSERT INTO tasks (name, priority, deadline, tags, uid, modified_at)
+                VALUES (?, ?, ?, ?, {_NEW_UID_SQL}, {_NOW_MS_SQL})
+                ''', self._task_insert_params(task_data))
+                task_id = cursor.lastrowid
             print(f"成功添加任务: {task_data['name']}")
             return task_id
             
         except sqlite3.Error as e:
             print(f"数据库错误: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def add_tasks(self, tasks_data):
+        """批量添加任务，所有任务在同一个事务中一次提交，返回添加的数量"""
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(f'''
+                INSERT INTO tasks (name, priority, deadline, tags, uid, modified_at)
+                VALUES (?, ?, ?, ?, {_NEW_UID_SQL}, {_NOW_MS_SQL})
+                ''', (self._task_insert_params(task_data) for task_data in tasks_data))
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"批量添加任务错误: {str(e)}")
+            raise
+
+    @staticmethod
+    def _task_insert_params(task_data):
+        return (task_data["name"].strip(),
+                task_data["priority"],
+                task_data["deadline"],
+                task_data.get("tags", ""))
 
     def get_all_tasks(self):
-        """获取所有任务"""
+        """获取所有任务（数据量大时优先使用 iter_tasks 逐页读取）"""
+        return list(self.iter_tasks())
+
+    def get_task(self, task_id):
+        """按 ID 获取单个任务，不存在时返回 None"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM tasks ORDER BY created_at DESC')
-            tasks = cursor.fetchall()
-            return tasks
-            
+            cursor = self._get_connection().cursor()
+            cursor.row_factory = task_row_factory
+            cursor.execute(f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?', (task_id,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            # 不能返回 None：调用方会把读取失败当作任务已被删除
+            print(f"获取任务错误: {str(e)}")
+            raise
+
+    def get_tasks_page(self, after=None, limit=DEFAULT_PAGE_SIZE, status=None, sync_status=None):
+        """按 (created_at, id) 倒序分页获取任务记录（Task）
+
+        after 为上一页返回的游标，status 取 TASK_STATUS_FILTERS 中的键，
+        sync_status 按同步状态过滤。返回 (任务列表, 下一页游标)，
+        没有更多数据时游标为 None。
+        """
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append(TASK_STATUS_FILTERS[status])
+        if sync_status is not None:
+            conditions.append('sync_status = ?')
+            params.append(sync_status)
+        if after is not None:
+            # 行值比较可以直接在 (created_at, id) 索引上定位，无需 OFFSET
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(limit)
+
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = task_row_factory
+        cursor.execute(f'''
+        SELECT {TASK_COLUMNS} FROM tasks {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        ''', params)
+        tasks = cursor.fetchall()
+        next_cursor = None
+        if len(tasks) == limit:
+            last = tasks[-1]
+            next_cursor = (last.created_at, last.id)
+        return tasks, next_cursor
+
+    def iter_tasks(self, page_size=DEFAULT_PAGE_SIZE, status=None, sync_status=None):
+        """逐页读取任务的生成器，内存占用只与 page_size 有关
+
+        每页查询完成后才返回数据，遍历过程中可以安全地写入数据库。
+        读取出错时打印错误并提前结束；需要完整结果的调用方使用 load_all_tasks。
+        """
+        try:
+            yield from self._iter_task_pages(page_size, status, sync_status)
+        except sqlite3.Error as e:
+            print(f"获取任务列表错误: {str(e)}")
+
+    def load_all_tasks(self, page_size=DEFAULT_PAGE_SIZE):
+        """逐页读取全部任务并返回列表，读取出错时抛出异常而不是返回已读到的部分"""
+        try:
+            return list(self._iter_task_pages(page_size))
+        except sqlite3.Error as e:
+            print(f"获取任务列表错误: {str(e)}")
+            raise
+
+    def _iter_task_pages(self, page_size, status=None, sync_status=None):
+        after = None
+        while True:
+            tasks, after = self.get_tasks_page(after, page_size, status, sync_status)
+            yield from tasks
+            if after is None:
+                return
+
+    def get_tasks_due(self, start_day, end_day, include_completed=True):
+        """获取截止日期在 [start_day, end_day] 之间的任务，按截止日期排序
+
+        参数为 epoch_day() 形式的天数，查询走 deadline_day 索引的范围扫描。
+        """
+        open_only = '' if include_completed else 'AND progress < 100'
+        return self._query_tasks(f'''
+        SELECT {TASK_COLUMNS} FROM tasks
+        WHERE deadline_day BETWEEN ? AND ? {open_only}
+        ORDER BY deadline_day, id
+        ''', (start_day, end_day))
+
+    def get_tasks_due_in(self, window, today=None):
+        """获取 DUE_WINDOWS 中指定窗口（今天/明天/本周）内到期的任务"""
+        return self.get_tasks_due(*due_window_days(window, today))
+
+    def get_overdue_tasks(self, today=None):
+        """获取已过截止日期且未完成的任务"""
+        return self._query_tasks(f'''
+        SELECT {TASK_COLUMNS} FROM tasks
+        WHERE deadline_day < ? AND progress < 100
+        ORDER BY deadline_day, id
+        ''', (epoch_day(today),))
+
+    def count_overdue_tasks(self, today=None):
+        """统计已逾期的未完成任务数量，只需扫描部分索引"""
+        try:
+            conn = self._get_connection()
+            return conn.execute('''
+            SELECT COUNT(*) FROM tasks WHERE deadline_day < ? AND progress < 100
+            ''', (epoch_day(today),)).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"统计逾期任务错误: {str(e)}")
+            return 0
+
+    def _query_tasks(self, sql, params):
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.row_factory = task_row_factory
+            cursor.execute(sql, params)
+            return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"获取任务列表错误: {str(e)}")
             return []
-        finally:
-            if conn:
-                conn.close()
+
+    def search_tasks(self, query, limit=50):
+        """按关键词搜索任务名称与标签，返回按相关度排序的 Task 列表
+
+        多个关键词之间为“与”关系，名称以关键词开头的任务排在最前。
+        不少于三个字符的关键词走 FTS5 索引，更短的关键词用 LIKE 在结果上过滤。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        prefix = f'{_escape_like(terms[0])}%'
+        long_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH]
+        use_fts = bool(long_terms) and self._has_search_index()
+
+        conditions = []
+        params = []
+        if use_fts:
+            conditions.append('tasks_fts MATCH ?')
+            params.append(' '.join('"{}"'.format(term.replace('"', '""'))
+                                   for term in long_terms))
+            terms = [term for term in terms if len(term) < FTS_MIN_TERM_LENGTH]
+        for term in terms:
+            pattern = f'%{_escape_like(term)}%'
+            conditions.append("(t.name LIKE ? ESCAPE '\\' OR t.tags LIKE ? ESCAPE '\\')")
+            params.extend((pattern, pattern))
+
+        columns = ', '.join(f't.{field}' for field in Task._fields)
+        source = 'tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid' if use_fts else 'tasks t'
+        rank = 'tasks_fts.rank' if use_fts else 't.created_at DESC'
+        params.extend((prefix, limit))
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.row_factory = task_row_factory
+            cursor.execute(f'''
+            SELECT {columns} FROM {source}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY t.name LIKE ? ESCAPE '\\' DESC, {rank}
+            LIMIT ?
+            ''', params)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"搜索任务错误: {str(e)}")
+            return []
+
+    def _has_search_index(self):
+        if self._search_index is None:
+            conn = self._get_connection()
+            self._search_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone() is not None
+        return self._search_index
+
+    def get_subtasks(self, task_id):
+        """获取任务的全部子任务记录（Subtask）"""
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.row_factory = subtask_row_factory
+            cursor.execute(f'''
+            SELECT {SUBTASK_COLUMNS} FROM subtasks
+            WHERE task_id = ? ORDER BY id
+            ''', (task_id,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"获取子任务错误: {str(e)}")
+            return []
+
+    def get_subtask(self, subtask_id):
+        """按 ID 获取单个子任务，不存在时返回 None"""
+        try:
+            cursor = self._get_connection().cursor()
+            cursor.row_factory = subtask_row_factory
+            cursor.execute(f'SELECT {SUBTASK_COLUMNS} FROM subtasks WHERE id = ?', (subtask_id,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"获取子任务错误: {str(e)}")
+            return None
+
+    def add_subtask(self, subtask_data):
+        """添加子任务，所属任务的子任务计数与进度由触发器更新"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('''
+                INSERT INTO subtasks (task_id, name, status, target_time)
+                VALUES (?, ?, ?, ?)
+                ''', self._subtask_insert_params(subtask_data))
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"添加子任务错误: {str(e)}")
+            raise
+
+    def add_subtasks(self, subtasks_data):
+        """批量添加子任务，在同一个事务中一次提交"""
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany('''
+                INSERT INTO subtasks (task_id, name, status, target_time)
+                VALUES (?, ?, ?, ?)
+                ''', (self._subtask_insert_params(data) for data in subtasks_data))
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"批量添加子任务错误: {str(e)}")
+            raise
+
+    @staticmethod
+    def _subtask_insert_params(subtask_data):
+        return (subtask_data["task_id"],
+                subtask_data["name"].strip(),
+                subtask_data.get("status", "pending"),
+                subtask_data.get("target_time"))
+
+    def update_subtask_status(self, subtask_id, status, completed_time=None):
+        """更新子任务状态（完成时为 SUBTASK_DONE），可同时记录实际用时"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('''
+                UPDATE subtasks
+                SET status = ?, completed_time = COALESCE(?, completed_time)
+                WHERE id = ?
+                ''', (status, completed_time, subtask_id))
+        except sqlite3.Error as e:
+            print(f"更新子任务错误: {str(e)}")
+            raise
+
+    def complete_subtask(self, subtask_id, completed_time=None):
+        """标记子任务为完成"""
+        self.update_subtask_status(subtask_id, SUBTASK_DONE, completed_time)
+
+    def delete_subtask(self, subtask_id):
+        """删除子任务"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('DELETE FROM subtasks WHERE id = ?', (subtask_id,))
+        except sqlite3.Error as e:
+            print(f"删除子任务错误: {str(e)}")
+            raise
 
     def delete_task(self, task_id):
         """删除任务"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # 先删除子任务
-            cursor.execute('DELETE FROM subtasks WHERE task_id = ?', (task_id,))
-            # 再删除主任务
-            cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            
-            conn.commit()
+            with self.transaction() as cursor:
+                # 先删除主任务，子任务触发器对已删除的任务不再做进度汇总
+                cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                # 再删除子任务和同步日志
+                cursor.execute('DELETE FROM subtasks WHERE task_id = ?', (task_id,))
+                cursor.execute('DELETE FROM sync_logs WHERE task_id = ?', (task_id,))
         except sqlite3.Error as e:
             print(f"删除任务错误: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def update_task_progress(self, task_id, progress):
         """更新任务进度"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            UPDATE tasks SET progress = ? WHERE id = ?
-            ''', (progress, task_id))
-            
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute('''
+                UPDATE tasks SET progress = ? WHERE id = ?
+                ''', (progress, task_id))
         except sqlite3.Error as e:
             print(f"更新进度错误: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def update_task(self, task_data):
         """更新任务信息"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            UPDATE tasks 
-            SET name = ?, priority = ?, deadline = ?
-            WHERE id = ?
-            ''', (task_data["name"], task_data["priority"], 
-                  task_data["deadline"], task_data["id"]))
-            
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute('''
+                UPDATE tasks 
+                SET name = ?, priority = ?, deadline = ?
+                WHERE id = ?
+                ''', self._task_update_params(task_data))
             print(f"成功更新任务: {task_data['name']}")
             
         except sqlite3.Error as e:
             print(f"更新任务错误: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def update_tasks(self, tasks_data):
+        """批量更新任务信息，所有修改在同一个事务中一次提交"""
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany('''
+                UPDATE tasks 
+                SET name = ?, priority = ?, deadline = ?
+                WHERE id = ?
+                ''', (self._task_update_params(task_data) for task_data in tasks_data))
+        except sqlite3.Error as e:
+            print(f"批量更新任务错误: {str(e)}")
+            raise
+
+    @staticmethod
+    def _task_update_params(task_data):
+        return (task_data["name"], task_data["priority"],
+                task_data["deadline"], task_data["id"])
 
     def get_task_statistics(self):
-        """获取任务统计数据"""
+        """获取任务统计数据，直接读取由触发器维护的计数器"""
+        conn = self._get_connection()
+        stats = dict(conn.execute('SELECT name, value FROM task_counters'))
+        if set(TASK_COUNTERS) - stats.keys():
+            # 计数器缺失时退回到一次性聚合查询
+            return self._compute_task_statistics(conn)
+        return stats
+
+    def check_task_statistics(self, repair=True):
+        """用一次聚合查询校验计数器是否与实际数据一致
+
+        返回是否一致；不一致且 repair 为 True 时用聚合结果重建计数器。
+        """
+        with self.transaction() as cursor:
+            expected = self._compute_task_statistics(cursor)
+            consistent = dict(cursor.execute('SELECT name, value FROM task_counters')) == expected
+            if not consistent and repair:
+                _reset_task_counters(cursor, expected)
+        return consistent
+
+    @staticmethod
+    def _compute_task_statistics(conn):
+        """单次扫描计算全部统计数据"""
+        row = conn.execute(TASK_STATISTICS_SQL).fetchone()
+        return dict(zip(TASK_COUNTERS, row))
+
+    def get_daily_rollups(self, start_day, end_day):
+        """读取 [start_day, end_day] 内的每日汇总，按天升序返回
+
+        每行为 (day, completed, completion_seconds, due, met)，没有任何记录的日期不返回。
+        只读取汇总表，不扫描任务表；按周、按月的聚合见 models.time_series。
+        """
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # 获取各种统计数据
-            stats = {
-                'total': cursor.execute('SELECT COUNT(*) FROM tasks').fetchone()[0],
-                'completed': cursor.execute('SELECT COUNT(*) FROM tasks WHERE progress = 100').fetchone()[0],
-                'in_progress': cursor.execute('SELECT COUNT(*) FROM tasks WHERE progress > 0 AND progress < 100').fetchone()[0],
-                'pending': cursor.execute('SELECT COUNT(*) FROM tasks WHERE progress = 0').fetchone()[0],
-                'synced': cursor.execute('SELECT COUNT(*) FROM tasks WHERE sync_status = "synced"').fetchone()[0],
-                'pending_sync': cursor.execute('SELECT COUNT(*) FROM tasks WHERE sync_status = "pending"').fetchone()[0],
-                'sync_errors': cursor.execute('SELECT COUNT(*) FROM sync_logs WHERE sync_status = "error"').fetchone()[0]
-            }
-            
-            return stats
-        finally:
-            if conn:
-                conn.close()
+            conn = self._get_connection()
+            return conn.execute('''
+            SELECT day, SUM(completed), SUM(completion_seconds), SUM(due), SUM(met) FROM (
+                SELECT day, completed, completion_seconds, 0 AS due, 0 AS met
+                FROM completion_daily WHERE day BETWEEN ? AND ?
+                UNION ALL
+                SELECT day, 0, 0, due, met
+                FROM deadline_daily WHERE day BETWEEN ? AND ?
+            )
+            GROUP BY day ORDER BY day
+            ''', (start_day, end_day, start_day, end_day)).fetchall()
+        except sqlite3.Error as e:
+            print(f"读取每日统计错误: {str(e)}")
+            return []
+
+    def rebuild_daily_rollups(self):
+        """从任务表重新生成每日汇总表"""
+        with self.transaction() as cursor:
+            _rebuild_completion_rollups(cursor)
+
+    def add_pomodoro_sessions(self, sessions):
+        """批量记录完成的番茄钟专注时段，在同一个事务中一次提交
+
+        每项包含 started_at、ended_at（UTC 时间文本）、duration（秒），可选 task_id。
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany('''
+                INSERT INTO pomodoro_sessions (task_id, started_at, ended_at, duration)
+                VALUES (?, ?, ?, ?)
+                ''', ((session.get("task_id"), session["started_at"],
+                       session["ended_at"], session["duration"]) for session in sessions))
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"记录番茄钟错误: {str(e)}")
+            raise
 
     def update_sync_status(self, task_id, status, message=None):
         """更新任务同步状态"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # 更新任务同步状态
-            cursor.execute('''
-            UPDATE tasks 
-            SET sync_status = ?, last_sync_time = CURRENT_TIMESTAMP
-            WHERE id = ?
-            ''', (status, task_id))
-            
-            # 记录同步日志
-            if message:
+            with self.transaction() as cursor:
+                # 更新任务同步状态
                 cursor.execute('''
-                INSERT INTO sync_logs (task_id, sync_status, sync_message)
-                VALUES (?, ?, ?)
-                ''', (task_id, status, message))
-            
-            conn.commit()
+                UPDATE tasks 
+                SET sync_status = ?, last_sync_time = CURRENT_TIMESTAMP
+                WHERE id = ?
+                ''', (status, task_id))
+                
+                # 记录同步日志
+                if message:
+                    cursor.execute('''
+                    INSERT INTO sync_logs (task_id, sync_status, sync_message)
+                    VALUES (?, ?, ?)
+                    ''', (task_id, status, message))
             return True
         except sqlite3.Error as e:
             print(f"更新同步状态错误: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
 
     def get_unsynced_tasks(self):
-        """获取所有未同步的任务"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            SELECT * FROM tasks 
-            WHERE sync_status = 'pending' 
-            ORDER BY created_at DESC
-            ''')
-            tasks = cursor.fetchall()
-            return tasks
-        except sqlite3.Error as e:
-            print(f"获取未同步任务错误: {str(e)}")
-            return []
-        finally:
-            if conn:
-                conn.close()
+        """获取所有未同步的任务（数据量大时优先使用 iter_tasks 逐页读取）"""
+        return list(self.iter_tasks(sync_status='pending'))
 
     def increment_sync_version(self, task_id):
         """增加任务同步版本号"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            UPDATE tasks 
-            SET sync_version = sync_version + 1 
-            WHERE id = ?
-            ''', (task_id,))
-            
-            conn.commit()
+            with self.transaction() as cursor:
+                cursor.execute('''
+                UPDATE tasks 
+                SET sync_version = sync_version + 1 
+                WHERE id = ?
+                ''', (task_id,))
             return True
         except sqlite3.Error as e:
             print(f"增加同步版本号错误: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
+
+    # ---- 增量同步 ----
+
+    def get_sync_device(self):
+        """本设备的同步标识，首次调用时生成并保存在数据库中"""
+        if self._sync_device is None:
+            conn = self._get_connection()
+            row = conn.execute("SELECT value FROM sync_state WHERE key = 'device'").fetchone()
+            if row is None:
+                with self.transaction() as cursor:
+                    cursor.execute(f'''
+                    INSERT OR IGNORE INTO sync_state (key, value)
+                    VALUES ('device', {_NEW_UID_SQL})
+                    ''')
+                    row = cursor.execute(
+                        "SELECT value FROM sync_state WHERE key = 'device'").fetchone()
+            self._sync_device = row[0]
+        return self._sync_device
+
+    def get_sync_state(self, key, default=None):
+        """读取 sync_state 中保存的同步状态"""
+        row = self._get_connection().execute(
+            'SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_sync_state(self, key, value):
+        """保存同步状态，value 为 None 时删除该项"""
+        try:
+            with self.transaction() as cursor:
+                if value is None:
+                    cursor.execute('DELETE FROM sync_state WHERE key = ?', (key,))
+                else:
+                    cursor.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                                   (key, value))
+        except sqlite3.Error as e:
+            print(f"保存同步状态错误: {str(e)}")
+            raise
+
+    def allocate_sync_batch(self):
+        """分配本设备下一个上传批次的编号（从 1 开始递增）
+
+        编号在上传之前分配并立即提交，上传失败时该编号作废，不会被重复使用。
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute('''
+                INSERT INTO sync_state (key, value) VALUES ('next_batch', 1)
+                ON CONFLICT (key) DO UPDATE SET value = value + 1
+                ''')
+                return int(cursor.execute(
+                    "SELECT value FROM sync_state WHERE key = 'next_batch'").fetchone()[0])
+        except sqlite3.Error as e:
+            print(f"分配同步批次错误: {str(e)}")
+            raise
+
+    def get_sync_peers(self):
+        """其他设备已应用到的批次编号 {device: last_batch}"""
+        conn = self._get_connection()
+        return dict(conn.execute('SELECT device, last_batch FROM sync_peers'))
+
+    def iter_sync_changes(self, batch_size=SYNC_BATCH_SIZE):
+        """逐批读取尚未上传的本地修改，生成 (upserts, deletes)
+
+        upserts 中每项按 SYNC_RECORD_FIELDS 排列，最后一项为子任务列表
+        （每个子任务按 SYNC_SUBTASK_FIELDS 排列）；deletes 中每项为 (uid, deleted_at)。
+        只读取 sync_status 索引与删除记录表，耗时与修改数量成正比；
+        下一批在上一批处理完之后才读取，期间可以写入数据库。
+        """
+        conn = self._get_connection()
+        after = None
+        while True:
+            condition, params = "sync_status = 'pending'", []
+            if after is not None:
+                condition += ' AND (created_at, id) > (?, ?)'
+                params.extend(after)
+            rows = conn.execute(f'''
+            SELECT id, {SYNC_RECORD_COLUMNS} FROM tasks
+            WHERE {condition}
+            ORDER BY created_at, id
+            LIMIT ?
+            ''', params + [batch_size]).fetchall()
+            if not rows:
+                break
+            subtasks = self._get_sync_subtasks(conn, [row[0] for row in rows])
+            yield [row[1:] + (subtasks.get(row[0], []),) for row in rows], []
+            if len(rows) < batch_size:
+                break
+            last = rows[-1]
+            after = (last[SYNC_RECORD_FIELDS.index('created_at') + 1], last[0])
+
+        after = ''
+        while True:
+            deletes = conn.execute('''
+            SELECT uid, deleted_at FROM sync_tombstones
+            WHERE origin IS NULL AND uid > ? ORDER BY uid LIMIT ?
+            ''', (after, batch_size)).fetchall()
+            if not deletes:
+                break
+            yield [], deletes
+            if len(deletes) < batch_size:
+                break
+            after = deletes[-1][0]
+
+    @staticmethod
+    def _get_sync_subtasks(conn, task_ids):
+        subtasks = {}
+        placeholders = ', '.join('?' * len(task_ids))
+        for row in conn.execute(f'''
+        SELECT task_id, {', '.join(SYNC_SUBTASK_FIELDS)} FROM subtasks
+        WHERE task_id IN ({placeholders})
+        ORDER BY task_id, id
+        ''', task_ids):
+            subtasks.setdefault(row[0], []).append(row[1:])
+        return subtasks
+
+    def mark_changes_synced(self, upserts, deletes, batch=None):
+        """上传成功后在一个事务内批量确认，返回被标记为已同步的任务 ID
+
+        batch 为已上传的批次编号，记录为 sync_state 中的 uploaded_batch，
+        批次编号文件落后于它时下次同步会重新上传编号文件。
+
+        只确认内容与上传时一致的任务；上传期间又被修改的任务保持待同步，下次继续上传。
+        已上传的删除记录保留下来（记上本设备标识），用于拒绝之后到达的较旧修改。
+        """
+        local_device = self.get_sync_device()
+        fields = SYNC_RECORD_FIELDS
+        compared = [fields.index(name) for name in ('uid',) + SYNC_TASK_FIELDS + ('modified_at',)]
+        conditions = ' AND '.join(f'{fields[i]} IS ?' for i in compared)
+        try:
+            task_ids = []
+            with self.transaction() as cursor:
+                for record in upserts:
+                    row = cursor.execute(f'''
+                    UPDATE tasks
+                    SET sync_status = 'synced', sync_version = sync_version + 1,
+                        last_sync_time = CURRENT_TIMESTAMP
+                    WHERE {conditions} AND sync_status = 'pending'
+                    ''', [record[i] for i in compared])
+                    if row.rowcount:
+                        task_ids.append(cursor.execute(
+                            'SELECT id FROM tasks WHERE uid = ?', (record[0],)).fetchone()[0])
+                cursor.executemany('''
+                UPDATE sync_tombstones SET origin = ?
+                WHERE uid = ? AND deleted_at = ? AND origin IS NULL
+                ''', ((local_device, uid, deleted_at) for uid, deleted_at in deletes))
+                if batch is not None:
+                    cursor.execute('''
+                    INSERT INTO sync_state (key, value) VALUES ('uploaded_batch', ?)
+                    ON CONFLICT (key) DO UPDATE
+                    SET value = max(CAST(value AS INTEGER), excluded.value)
+                    ''', (batch,))
+            return task_ids
+        except sqlite3.Error as e:
+            print(f"确认同步状态错误: {str(e)}")
+            raise
+
+    def apply_sync_batch(self, device, batch, upserts, deletes):
+        """在一个事务内应用其他设备上传的一个批次，返回受影响的本地任务 ID
+
+        每个修改与本地记录（任务或删除记录，无论是否已同步）比较 (修改时间, 来源设备)，
+        只应用更新的修改，因此各设备无论以什么顺序应用批次，最终结果一致。
+        同时记录该设备已应用到的批次编号，下次不再下载。
+        """
+        local_device = self.get_sync_device()
+        modified_index = SYNC_RECORD_FIELDS.index('modified_at')
+
+        def local_state(cursor, uid):
+            # 返回 (本地任务 ID 或 None, 本地的 (修改时间, 来源设备))，没有任何记录时为 None
+            row = cursor.execute(
+                'SELECT id, modified_at, origin FROM tasks WHERE uid = ?', (uid,)).fetchone()
+            if row is None:
+                row = cursor.execute(
+                    'SELECT NULL, deleted_at, origin FROM sync_tombstones WHERE uid = ?',
+                    (uid,)).fetchone()
+            if row is None:
+                return None, None
+            return row[0], (row[1] or '', row[2] or local_device)
+
+        try:
+            task_ids = []
+            with self.transaction() as cursor:
+                for record in upserts:
+                    uid = record[0]
+                    task_id, local = local_state(cursor, uid)
+                    if local is not None and (record[modified_index] or '', device) <= local:
+                        continue
+                    if task_id is None:
+                        cursor.execute('DELETE FROM sync_tombstones WHERE uid = ?', (uid,))
+                        cursor.execute('INSERT INTO tasks (uid, name) VALUES (?, ?)', (uid, record[1]))
+                        task_id = cursor.lastrowid
+                    # 先替换子任务：进度汇总触发器会把任务标记为待同步，随后整行写入时再恢复
+                    cursor.execute('DELETE FROM subtasks WHERE task_id = ?', (task_id,))
+                    cursor.executemany(f'''
+                    INSERT INTO subtasks (task_id, {', '.join(SYNC_SUBTASK_FIELDS)})
+                    VALUES (?, {', '.join('?' * len(SYNC_SUBTASK_FIELDS))})
+                    ''', ((task_id, *subtask) for subtask in record[-1]))
+                    cursor.execute(f'''
+                    UPDATE tasks
+                    SET {_SYNC_ASSIGNMENTS}, origin = ?,
+                        sync_status = 'synced', sync_version = sync_version + 1,
+                        last_sync_time = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    ''', (*record[1:len(SYNC_RECORD_FIELDS)], device, task_id))
+                    task_ids.append(task_id)
+
+                for uid, deleted_at in deletes:
+                    task_id, local = local_state(cursor, uid)
+                    if local is not None and (deleted_at or '', device) <= local:
+                        continue
+                    if task_id is not None:
+                        cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                        cursor.execute('DELETE FROM subtasks WHERE task_id = ?', (task_id,))
+                        cursor.execute('DELETE FROM sync_logs WHERE task_id = ?', (task_id,))
+                        task_ids.append(task_id)
+                    # 替换删除触发器写入的待上传记录：远程已知的删除无需再上传
+                    cursor.execute('''
+                    INSERT OR REPLACE INTO sync_tombstones (uid, deleted_at, origin)
+                    VALUES (?, ?, ?)
+                    ''', (uid, deleted_at, device))
+
+                cursor.execute('''
+                INSERT INTO sync_peers (device, last_batch) VALUES (?, ?)
+                ON CONFLICT (device) DO UPDATE SET last_batch = max(last_batch, excluded.last_batch)
+                ''', (device, batch))
+            return task_ids
+        except sqlite3.Error as e:
+            print(f"应用同步数据错误: {str(e)}")
+            raise
+
+    # ---- 导入导出 ----
+
+    def iter_export_tasks(self, page_size=DEFAULT_PAGE_SIZE):
+        """按 ID 顺序逐页生成导出用的任务字典，子任务嵌套在 subtasks 中（与 Readme.md 的数据结构一致）
+
+        任务的 id 为跨设备的 uid，子任务的 id 为 "<任务 id>-<序号>"；Readme 中的
+        {"tasks": [...]} 整体文档在这里拆成每行一个任务，便于流式读写。
+        每页一次任务查询与一次子任务查询，内存占用只与 page_size 有关。
+        """
+        conn = self._get_connection()
+        after = 0
+        while True:
+            rows = conn.execute(f'''
+            SELECT id, {SYNC_RECORD_COLUMNS} FROM tasks WHERE id > ? ORDER BY id LIMIT ?
+            ''', (after, page_size)).fetchall()
+            if not rows:
+                break
+            subtasks = self._get_sync_subtasks(conn, [row[0] for row in rows])
+            for row in rows:
+                task = dict(zip(EXPORT_FIELDS, row[1:]))
+                task['subtasks'] = [{'id': f"{task['id']}-{number}",
+                                     **dict(zip(SYNC_SUBTASK_FIELDS, subtask))}
+                                    for number, subtask in enumerate(subtasks.get(row[0], ()), 1)]
+                yield task
+            if len(rows) < page_size:
+                break
+            after = rows[-1][0]
+
+    def export_tasks(self, path):
+        """把全部任务逐行写入 JSON Lines 文件（.gz 结尾时使用 gzip 压缩），返回任务数"""
+        count = 0
+        with _open_jsonl(path, 'wt') as f:
+            for task in self.iter_export_tasks():
+                f.write(json.dumps(task, ensure_ascii=False, separators=(',', ':')))
+                f.write('\n')
+                count += 1
+        return count
+
+    def import_tasks_file(self, path, chunk_size=IMPORT_CHUNK_SIZE):
+        """从 export_tasks 写出的 JSON Lines 文件逐行导入，返回导入的任务数"""
+        with _open_jsonl(path, 'rt') as f:
+            return self.import_tasks((json.loads(line) for line in f if line.strip()),
+                                     chunk_size)
+
+    def import_tasks(self, tasks, chunk_size=IMPORT_CHUNK_SIZE):
+        """导入任务字典的可迭代对象，按 id（uid）插入或更新，返回导入的任务数
+
+        每 chunk_size 个任务用 executemany 在一个事务中写入，内存占用与总数无关。
+        带有 subtasks 的任务用导入的子任务替换原有子任务；没有 id 的任务作为新任务插入。
+        导入视为本地修改：忽略文件中的 modified_at，任务会被标记为待同步。
+        """
+        count = 0
+        chunk = []
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) >= chunk_size:
+                count += self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            count += self._import_chunk(chunk)
+        return count
+
+    def _import_chunk(self, tasks):
+        # 没有 id 的任务在这里分配 uid，以便随后找到它们写入子任务
+        uids = [task.get('id') or uuid.uuid4().hex for task in tasks]
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(_IMPORT_UPSERT_SQL, (
+                    (uid, task['name'].strip(), task.get('priority'),
+                     task.get('deadline'), task.get('progress') or 0, task.get('tags', ''),
+                     task.get('created_at'), task.get('completed_at'))
+                    for uid, task in zip(uids, tasks)))
+
+                nested = [(uid, task) for uid, task in zip(uids, tasks) if 'subtasks' in task]
+                if nested:
+                    ids = dict(cursor.execute(
+                        f"SELECT uid, id FROM tasks WHERE uid IN ({', '.join('?' * len(nested))})",
+                        [uid for uid, _ in nested]))
+                    cursor.executemany('DELETE FROM subtasks WHERE task_id = ?',
+                                       ((ids[uid],) for uid, _ in nested))
+                    cursor.executemany(f'''
+                    INSERT INTO subtasks (task_id, {', '.join(SYNC_SUBTASK_FIELDS)})
+                    VALUES (?, {', '.join('?' * len(SYNC_SUBTASK_FIELDS))})
+                    ''', ((ids[uid], subtask['name'], subtask.get('status', 'pending'),
+                           subtask.get('target_time'), subtask.get('completed_time', 0))
+                          for uid, task in nested for subtask in task['subtasks']))
+                    # 子任务的汇总触发器会改写进度，与 apply_sync_batch 一样以导入的任务数据为准
+                    cursor.executemany(
+                        'UPDATE tasks SET progress = ?, completed_at = ? WHERE id = ?',
+                        ((task.get('progress') or 0, task.get('completed_at'), ids[uid])
+                         for uid, task in nested))
+            return len(tasks)
+        except (sqlite3.Error, KeyError) as e:
+            print(f"导入任务错误: {str(e)}")
+            raise
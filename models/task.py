@@ -0,0 +1,52 @@
+from typing import NamedTuple
+
+
+class Task(NamedTuple):
+    """任务记录，字段顺序与查询时的列顺序一致
+
+    基于 tuple 实现，没有实例 __dict__，按属性名访问字段时不需要哈希查找。
+    """
+    id: int
+    name: str
+    priority: str
+    deadline: str
+    progress: int
+    tags: str
+    created_at: str
+    last_sync_time: str
+    sync_status: str
+    sync_version: int
+    subtask_total: int
+    subtask_done: int
+    completed_at: str
+
+
+class Subtask(NamedTuple):
+    """子任务记录"""
+    id: int
+    task_id: int
+    name: str
+    status: str
+    target_time: int
+    completed_time: int
+    sync_version: int
+
+
+# 子任务完成状态
+SUBTASK_DONE = 'completed'
+
+# 查询时使用的列清单，表结构增加字段时不会影响记录类型
+TASK_COLUMNS = ', '.join(Task._fields)
+SUBTASK_COLUMNS = ', '.join(Subtask._fields)
+
+_new_tuple = tuple.__new__
+
+
+def task_row_factory(cursor, row):
+    """sqlite3 行工厂：直接把结果行构造成 Task"""
+    return _new_tuple(Task, row)
+
+
+def subtask_row_factory(cursor, row):
+    """sqlite3 行工厂：直接把结果行构造成 Subtask"""
+    return _new_tuple(Subtask, row)
@@ -0,0 +1,314 @@
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+import sqlite3
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+# 与 Database.TASK_STATUS_FILTERS 对应的内存过滤条件
+TASK_STATUS_PREDICATES = {
+    'completed': lambda task: task.progress == 100,
+    'in_progress': lambda task: 0 < task.progress < 100,
+    'pending': lambda task: task.progress == 0,
+}
+
+
+class TaskStore(QObject):
+    """Database 之上的写穿透任务缓存，由界面、统计和同步共用
+
+    首次读取时把任务按 ID 载入内存，之后的读取不再访问 SQLite。
+    写操作先落库，再重新读取受影响的那一行来修补缓存，并发出变化信号；
+    在 transaction() 中的写操作会在事务结束后统一修补和通知。
+    信号可能在后台线程中发出，连接到界面对象时会自动排队到 GUI 线程。
+    """
+
+    task_added = pyqtSignal(object)
+    task_updated = pyqtSignal(object)
+    task_removed = pyqtSignal(int)
+    # 缓存被整体丢弃（例如同步导入了大量数据）
+    tasks_reset = pyqtSignal()
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._by_id = None
+        # 按 (created_at, id) 升序排列的键，用于输出与数据库一致的顺序
+        self._keys = []
+        self._statistics = None
+        # 每次修补或丢弃缓存时递增，用于判断整表载入期间是否有写入
+        self._generation = 0
+
+    # ---- 读取 ----
+
+    def _ensure_loaded(self):
+        """缓存未载入时读取全部任务
+
+        整表读取在锁外进行，不阻塞其他线程读取单个任务；读取期间缓存被修补或丢弃时，
+        读到的结果可能已过时，丢弃后重新读取。读取出错时异常传给调用方，缓存保持未载入。
+        """
+        while True:
+            with self._lock:
+                if self._by_id is not None:
+                    return
+                generation = self._generation
+            tasks = self.db.load_all_tasks()
+            with self._lock:
+                if self._by_id is None and self._generation == generation:
+                    self._by_id = {task.id: task for task in tasks}
+                    self._keys = [self._key(task) for task in reversed(tasks)]
+                    return
+
+    @staticmethod
+    def _key(task):
+        return (task.created_at or '', task.id)
+
+    def tasks(self):
+        """按创建时间倒序返回全部任务"""
+        while True:
+            self._ensure_loaded()
+            with self._lock:
+                if self._by_id is not None:
+                    return [self._by_id[key[1]] for key in reversed(self._keys)]
+
+    def iter_tasks(self, page_size=None, status=None, sync_status=None):
+        """与 Database.iter_tasks 相同的过滤条件，直接从缓存中读取"""
+        predicate = TASK_STATUS_PREDICATES[status] if status is not None else None
+        for task in self.tasks():
+            if predicate is not None and not predicate(task):
+                continue
+            if sync_status is not None and task.sync_status != sync_status:
+                continue
+            yield task
+
+    def get_all_tasks(self):
+        return self.tasks()
+
+    def get_unsynced_tasks(self):
+        return list(self.iter_tasks(sync_status='pending'))
+
+    def get_task(self, task_id):
+        with self._lock:
+            if self._by_id is not None:
+                return self._by_id.get(task_id)
+        # 缓存尚未载入或正在重新载入时只读取这一行，不等待整表载入
+        return self.db.get_task(task_id)
+
+    def get_subtasks(self, task_id):
+        return self.db.get_subtasks(task_id)
+
+    def get_task_statistics(self):
+        with self._lock:
+            if self._statistics is None:
+                self._statistics = self.db.get_task_statistics()
+            return dict(self._statistics)
+
+    # 依赖当前日期或全文索引的查询直接交给数据库，它们本身走索引
+    def get_tasks_due_in(self, window, today=None):
+        return self.db.get_tasks_due_in(window, today)
+
+    def get_overdue_tasks(self, today=None):
+        return self.db.get_overdue_tasks(today)
+
+    def count_overdue_tasks(self, today=None):
+        return self.db.count_overdue_tasks(today)
+
+    def search_tasks(self, query, limit=50):
+        return self.db.search_tasks(query, limit)
+
+    def get_daily_rollups(self, start_day, end_day):
+        return self.db.get_daily_rollups(start_day, end_day)
+
+    def add_pomodoro_sessions(self, sessions):
+        return self.db.add_pomodoro_sessions(sessions)
+
+    # 增量同步的读取与编号分配不涉及缓存
+    def get_sync_device(self):
+        return self.db.get_sync_device()
+
+    def get_sync_peers(self):
+        return self.db.get_sync_peers()
+
+    def allocate_sync_batch(self):
+        return self.db.allocate_sync_batch()
+
+    def get_sync_state(self, key, default=None):
+        return self.db.get_sync_state(key, default)
+
+    def set_sync_state(self, key, value):
+        self.db.set_sync_state(key, value)
+
+    def iter_sync_changes(self, batch_size=None):
+        if batch_size is None:
+            return self.db.iter_sync_changes()
+        return self.db.iter_sync_changes(batch_size)
+
+    def iter_export_tasks(self):
+        return self.db.iter_export_tasks()
+
+    def export_tasks(self, path):
+        return self.db.export_tasks(path)
+
+    # ---- 写入 ----
+
+    @contextmanager
+    def transaction(self):
+        """包装 Database.transaction，事务结束（提交或回滚）后再修补缓存"""
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self._local.pending = []
+        self._local.depth = depth + 1
+        try:
+            with self.db.transaction() as cursor:
+                yield cursor
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                pending, self._local.pending = self._local.pending, []
+                for task_id in dict.fromkeys(pending):
+                    self._refresh(task_id)
+
+    def _changed(self, task_id):
+        if getattr(self._local, 'depth', 0):
+            self._local.pending.append(task_id)
+        else:
+            self._refresh(task_id)
+
+    def _refresh(self, task_id):
+        """从数据库重新读取一行并修补缓存，随后发出对应的信号
+
+        读取、修补与发出信号都在锁内完成：多个线程同时刷新同一任务时，
+        后修补的一定是后读到的数据，信号的先后顺序也与修补顺序一致。
+        """
+        with self._lock:
+            try:
+                task = self.db.get_task(task_id)
+            except sqlite3.Error:
+                # 无法确定这一行的状态，丢弃整个缓存，而不是把它当作已删除
+                self.invalidate()
+                return
+            self._statistics = None
+            self._generation += 1
+            existed = False
+            loaded = self._by_id is not None
+            if loaded:
+                old = self._by_id.pop(task_id, None)
+                existed = old is not None
+                if existed:
+                    del self._keys[bisect_left(self._keys, self._key(old))]
+                if task is not None:
+                    self._by_id[task_id] = task
+                    insort(self._keys, self._key(task))
+            if task is None:
+                self.task_removed.emit(task_id)
+            elif existed or not loaded:
+                self.task_updated.emit(task)
+            else:
+                self.task_added.emit(task)
+
+    def invalidate(self):
+        """丢弃整个缓存，下次读取时重新载入"""
+        with self._lock:
+            self._by_id = None
+            self._keys = []
+            self._statistics = None
+            self._generation += 1
+        self.tasks_reset.emit()
+
+    def add_task(self, task_data):
+        task_id = self.db.add_task(task_data)
+        self._changed(task_id)
+        return task_id
+
+    def add_tasks(self, tasks_data):
+        count = self.db.add_tasks(tasks_data)
+        self.invalidate()
+        return count
+
+    def update_task(self, task_data):
+        self.db.update_task(task_data)
+        self._changed(task_data["id"])
+
+    def update_tasks(self, tasks_data):
+        tasks_data = list(tasks_data)
+        with self.transaction():
+            self.db.update_tasks(tasks_data)
+            for task_data in tasks_data:
+                self._changed(task_data["id"])
+
+    def update_task_progress(self, task_id, progress):
+        self.db.update_task_progress(task_id, progress)
+        self._changed(task_id)
+
+    def delete_task(self, task_id):
+        self.db.delete_task(task_id)
+        self._changed(task_id)
+
+    def update_sync_status(self, task_id, status, message=None):
+        result = self.db.update_sync_status(task_id, status, message)
+        self._changed(task_id)
+        return result
+
+    def increment_sync_version(self, task_id):
+        result = self.db.increment_sync_version(task_id)
+        self._changed(task_id)
+        return result
+
+    def mark_changes_synced(self, upserts, deletes, batch=None):
+        with self.transaction():
+            task_ids = self.db.mark_changes_synced(upserts, deletes, batch)
+            for task_id in task_ids:
+                self._changed(task_id)
+        return task_ids
+
+    def apply_sync_batch(self, device, batch, upserts, deletes):
+        with self.transaction():
+            task_ids = self.db.apply_sync_batch(device, batch, upserts, deletes)
+            for task_id in task_ids:
+                self._changed(task_id)
+        return task_ids
+
+    def import_tasks(self, tasks):
+        """批量导入可能涉及任意多的任务，导入后整体重新载入缓存"""
+        try:
+            return self.db.import_tasks(tasks)
+        finally:
+            self.invalidate()
+
+    def import_tasks_file(self, path):
+        try:
+            return self.db.import_tasks_file(path)
+        finally:
+            self.invalidate()
+
+    def add_subtask(self, subtask_data):
+        subtask_id = self.db.add_subtask(subtask_data)
+        self._changed(subtask_data["task_id"])
+        return subtask_id
+
+    def add_subtasks(self, subtasks_data):
+        subtasks_data = list(subtasks_data)
+        count = self.db.add_subtasks(subtasks_data)
+        for task_id in dict.fromkeys(data["task_id"] for data in subtasks_data):
+            self._changed(task_id)
+        return count
+
+    def update_subtask_status(self, subtask_id, status, completed_time=None):
+        subtask = self.db.get_subtask(subtask_id)
+        self.db.update_subtask_status(subtask_id, status, completed_time)
+        if subtask is not None:
+            self._changed(subtask.task_id)
+
+    def complete_subtask(self, subtask_id, completed_time=None):
+        subtask = self.db.get_subtask(subtask_id)
+        self.db.complete_subtask(subtask_id, completed_time)
+        if subtask is not None:
+            self._changed(subtask.task_id)
+
+    def delete_subtask(self, subtask_id):
+        subtask = self.db.get_subtask(subtask_id)
+        self.db.delete_subtask(subtask_id)
+        if subtask is not None:
+            self._changed(subtask.task_id)
@@ -0,0 +1,79 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .database import epoch_day
+
+# 1970-01-05（第 4 天）是星期一，按周分组时以周一为一周的开始
+_FIRST_MONDAY = 4
+SECONDS_PER_DAY = 86400
+
+
+class DailyRollups(NamedTuple):
+    """按天连续展开的汇总数组，下标 i 对应 start_day + i"""
+    start_day: int
+    completed: np.ndarray
+    completion_seconds: np.ndarray
+    due: np.ndarray
+    met: np.ndarray
+
+
+class PeriodSeries(NamedTuple):
+    """按周或按月聚合后的时间序列"""
+    starts: np.ndarray             # 每个周期第一天（epoch day）
+    completed: np.ndarray          # 周期内完成的任务数
+    average_days: np.ndarray       # 周期内完成任务的平均用时（天），没有完成任务时为 NaN
+    overdue: np.ndarray            # 截止日期落在周期内且未按时完成的任务数
+
+
+def expand_rollups(rows, start_day, end_day):
+    """把 Database.get_daily_rollups 返回的稀疏行展开为按天连续的数组"""
+    data = np.zeros((4, end_day - start_day + 1))
+    if rows:
+        table = np.asarray(rows, dtype=np.float64)
+        data[:, table[:, 0].astype(np.int64) - start_day] = table[:, 1:].T
+    return DailyRollups(start_day, *data)
+
+
+def period_starts(days, period):
+    """每一天所属周期的第一天，period 为 'week' 或 'month'"""
+    if period == 'week':
+        return days - (days - _FIRST_MONDAY) % 7
+    if period == 'month':
+        months = days.astype('datetime64[D]').astype('datetime64[M]')
+        return months.astype('datetime64[D]').astype(np.int64)
+    raise ValueError(f"未知的统计周期: {period}")
+
+
+def aggregate(rollups, period, today=None):
+    """把每日汇总按周或按月聚合
+
+    逾期数只统计截止日期早于今天的日期：这些天到期的任务减去按时完成的任务。
+    """
+    days = rollups.start_day + np.arange(len(rollups.completed))
+    starts, groups = np.unique(period_starts(days, period), return_inverse=True)
+
+    def total(values):
+        return np.bincount(groups, weights=values, minlength=len(starts))
+
+    completed = total(rollups.completed)
+    seconds = total(rollups.completion_seconds)
+    missed = np.where(days < epoch_day(today), rollups.due - rollups.met, 0)
+    average_days = np.divide(seconds, completed * SECONDS_PER_DAY,
+                             out=np.full(len(starts), np.nan), where=completed > 0)
+    return PeriodSeries(starts, completed.astype(np.int64), average_days,
+                        total(missed).astype(np.int64))
+
+
+def summarize(rollups, today=None):
+    """整个区间的完成数、平均完成用时（天）与逾期数"""
+    completed = int(rollups.completed.sum())
+    days = rollups.start_day + np.arange(len(rollups.completed))
+    missed = np.where(days < epoch_day(today), rollups.due - rollups.met, 0)
+    average_days = (rollups.completion_seconds.sum() / completed / SECONDS_PER_DAY
+                    if completed else None)
+    return {
+        'completed': completed,
+        'average_days': average_days,
+        'overdue': int(missed.sum()),
+    }
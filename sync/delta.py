@@ -0,0 +1,145 @@
+from itertools import chain
+import json
+import zlib
+
+from models.database import SYNC_RECORD_FIELDS, SYNC_SUBTASK_FIELDS
+
+# 服务器上每个文件是一个设备上传的一批修改，文件名为 "<设备标识>-<批次编号>.json"，
+# 同一设备的批次编号递增。
+CHANGES_DIR = '/tasks/changes/'
+# 每台设备一个文件，内容为该设备已上传的最新批次编号；文件名为设备标识
+HEADS_DIR = '/tasks/heads/'
+
+# 批次格式版本：
+#   1  未压缩的单个 JSON 对象，任务按 SYNC_RECORD_FIELDS 的顺序存为数组
+#   2  gzip 压缩的 JSON Lines：第一行为批次头（字段名只在这里出现一次），
+#      之后每行是最多 ROWS_PER_LINE 个任务数组组成的数组，最后是删除记录 [uid, deleted_at]
+BATCH_FORMAT = 2
+GZIP_MAGIC = b'\x1f\x8b'
+COMPRESS_LEVEL = 6
+# wbits=31 表示带 gzip 文件头与校验和的 DEFLATE 流
+_GZIP_WBITS = 31
+# 每行包含的记录数：一行一次 json.dumps/json.loads，也是解码时每次交给数据库的记录数
+ROWS_PER_LINE = 500
+# iter_chunks 切分已下载数据时每块的字节数
+CHUNK_SIZE = 64 * 1024
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def batch_name(device, batch):
+    return f'{device}-{batch:08d}.json'
+
+
+def encode_head(batch):
+    return str(batch).encode('ascii')
+
+
+def parse_head(data):
+    return int(data.decode('ascii').strip() or 0)
+
+
+def batch_header(device, batch, upsert_count, delete_count):
+    return {
+        'format': BATCH_FORMAT,
+        'device': device,
+        'batch': batch,
+        'fields': list(SYNC_RECORD_FIELDS),
+        'subtask_fields': list(SYNC_SUBTASK_FIELDS),
+        'upserts': upsert_count,
+        'deletes': delete_count,
+    }
+
+
+def iter_encode_batch(device, batch, upserts, deletes):
+    """逐块生成压缩后的批次内容（格式 2），不在内存中拼出完整的 JSON 文本"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+    yield compressor.compress(
+        (_dumps(batch_header(device, batch, len(upserts), len(deletes))) + '\n').encode('utf-8'))
+    for rows in (upserts, deletes):
+        for start in range(0, len(rows), ROWS_PER_LINE):
+            data = compressor.compress(
+                (_dumps(rows[start:start + ROWS_PER_LINE]) + '\n').encode('utf-8'))
+            if data:
+                yield data
+    yield compressor.flush()
+
+
+def encode_batch(device, batch, upserts, deletes):
+    """把一批修改编码为上传用的字节串"""
+    return b''.join(iter_encode_batch(device, batch, upserts, deletes))
+
+
+def _iter_lines(chunks):
+    """解压 gzip 数据块并逐行解析 JSON"""
+    decompressor = zlib.decompressobj(_GZIP_WBITS)
+    rest = b''
+    for chunk in chunks:
+        lines = (rest + decompressor.decompress(chunk)).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            yield json.loads(line)
+    rest += decompressor.flush()
+    if not decompressor.eof:
+        raise ValueError("同步批次数据不完整")
+    if rest.strip():
+        yield json.loads(rest)
+
+
+def _check_header(header):
+    if header.get('format') not in (1, BATCH_FORMAT):
+        raise ValueError(f"不支持的同步批次格式: {header.get('format')}")
+    if (header['fields'] != list(SYNC_RECORD_FIELDS)
+            or header['subtask_fields'] != list(SYNC_SUBTASK_FIELDS)):
+        raise ValueError("同步批次的字段与本地版本不一致")
+
+
+def read_batch(chunks):
+    """流式解码批次，chunks 为数据块的可迭代对象（例如 HTTP 响应的 iter_content）
+
+    返回 (header, records)：records 是生成器，依次产生 (upserts, deletes) 小批，
+    每批最多 ROWS_PER_LINE 条记录，记录为列表。内存占用与批次大小无关。
+    兼容格式 1（未压缩，只能整体解析）。
+    """
+    chunks = iter(chunks)
+    first = b''
+    for chunk in chunks:
+        first += chunk
+        if len(first) >= len(GZIP_MAGIC):
+            break
+    if not first.startswith(GZIP_MAGIC):
+        payload = json.loads(b''.join(chain((first,), chunks)))
+        _check_header(payload)
+        return payload, iter([(payload['upserts'], payload['deletes'])])
+
+    lines = _iter_lines(chain((first,), chunks))
+    header = next(lines)
+    _check_header(header)
+
+    def records():
+        for kind in ('upserts', 'deletes'):
+            remaining = header[kind]
+            while remaining:
+                rows = next(lines, None)
+                if not rows:
+                    raise ValueError("同步批次数据不完整")
+                remaining -= len(rows)
+                yield (rows, []) if kind == 'upserts' else ([], rows)
+
+    return header, records()
+
+
+def iter_chunks(data, size=CHUNK_SIZE):
+    """把已下载的字节串切成小块交给 read_batch，解压后的文本不会一次性出现在内存中"""
+    view = memoryview(data)
+    return (view[start:start + size] for start in range(0, len(view), size))
+
+
+def decode_batch(data):
+    """一次性解码整个批次，返回 (upserts, deletes)"""
+    header, records = read_batch(iter_chunks(data))
+    upserts, deletes = [], []
+    for batch_upserts, batch_deletes in records:
+        upserts.extend(batch_upserts)
+        deletes.extend(batch_deletes)
+    return upserts, deletes
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from typing import NamedTuple
+
+# 读取文件计算哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class ManifestEntry(NamedTuple):
+    """某个远程路径最后一次成功传输的内容"""
+    sha256: str
+    etag: str      # 服务器返回的 ETag，服务器不提供时为 None
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    """分块读取文件计算 SHA-256，文件不存在时返回 None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """本地传输清单：记录每个远程路径最后一次上传或下载的内容哈希与 ETag
+
+    清单保存在数据库的 sync_state 表中，与任务数据一起备份和迁移。
+    内容哈希相同的文件不再上传；ETag 用于条件请求，远程未变化时服务器只返回 304。
+    """
+
+    KEY_PREFIX = 'manifest:'
+
+    def __init__(self, db):
+        self.db = db
+        self._entries = {}
+
+    def get(self, remote_path):
+        if remote_path not in self._entries:
+            value = self.db.get_sync_state(self.KEY_PREFIX + remote_path)
+            self._entries[remote_path] = ManifestEntry(*json.loads(value)) if value else None
+        return self._entries[remote_path]
+
+    def set(self, remote_path, sha256, etag):
+        entry = ManifestEntry(sha256, etag)
+        if self.get(remote_path) != entry:
+            self.db.set_sync_state(self.KEY_PREFIX + remote_path, json.dumps(entry))
+            self._entries[remote_path] = entry
+
+    def discard(self, remote_path):
+        if self.get(remote_path) is not None:
+            self.db.set_sync_state(self.KEY_PREFIX + remote_path, None)
+            self._entries[remote_path] = None
@@ -1,12 +1,31 @@
-from webdav3.client import Client
+from webdav3.client import Client, WebDavXmlUtils
+from webdav3.exceptions import RemoteResourceNotFound, ResponseErrorCode
+from webdav3.urn import Urn
 import json
 import os
+import threading
 import time
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 import logging
-from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .delta import (CHANGES_DIR, HEADS_DIR, batch_name, encode_batch, read_batch,
+                    iter_chunks, encode_head, parse_head)
+from .manifest import SyncManifest, content_hash, file_hash
+
+
+class RemoteChanged(Exception):
+    """条件上传失败：远程文件在上次传输之后已被修改"""
+
+
+class SyncCancelled(Exception):
+    """cancel_event 被设置，同步在下一个批次开始前中止"""
 
 class WebDAVSync(QObject):
+    # 增量同步的进度说明，在执行同步的线程中发出
+    progress = pyqtSignal(str)
+
     def __init__(self, db):
         super().__init__()
         self.db = db
@@ -21,6 +40,9 @@ class WebDAVSync(QObject):
         self.last_sync_time = 0
         self.logger = self._setup_logger()
         self.connected = False
+        self.manifest = SyncManifest(db)
+        # 由其他线程设置以中止进行中的增量同步，由发起同步的一方在开始前清除
+        self.cancel_event = threading.Event()
         self.config_file = 'webdav_config.json'
         
     def connect(self, url, username, password):
@@ -77,27 +99,103 @@ class WebDAVSync(QObject):
         logger.addHandler(handler)
         return logger
     
+    # ---- 条件请求 ----
+    # 直接发送单个 HTTP 请求：webdav3 的 upload_to/download_from/info 会先用额外的请求检查路径
+
+    def _request(self, action, remote_path, data=None, headers=None, directory=False):
+        return self.client.execute_request(
+            action=action, path=Urn(remote_path, directory=directory).quote(),
+            data=data, headers_ext=headers)
+
+    def _get(self, remote_path, etag=None):
+        """下载远程文件，返回 (内容, ETag)；给出 etag 且远程未变化时内容为 None"""
+        headers = [f'If-None-Match: {etag}'] if etag else None
+        response = self._request('download', remote_path, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        return response.content, response.headers.get('ETag')
+
+    def _put(self, remote_path, data, etag=None):
+        """上传内容，返回服务器给出的新 ETag
+
+        给出 etag 时附带 If-Match，远程文件在此期间被其他设备修改则抛出 RemoteChanged。
+        """
+        headers = [f'If-Match: {etag}'] if etag else None
+        try:
+            response = self._request('upload', remote_path, data=data, headers=headers)
+        except ResponseErrorCode as e:
+            if e.code == 412:
+                raise RemoteChanged(remote_path) from e
+            raise
+        return response.headers.get('ETag')
+
+    def _remote_info(self, remote_path):
+        """一次 PROPFIND（Depth: 0）读取远程文件信息，不存在时返回 None"""
+        try:
+            response = self._request('info', remote_path, headers=['Depth: 0'])
+        except RemoteResourceNotFound:
+            return None
+        return WebDavXmlUtils.parse_info_response(
+            content=response.content, path=self.client.get_full_path(Urn(remote_path)),
+            hostname=self.client.webdav.hostname)
+
+    def _list_etags(self, remote_dir):
+        """一次 PROPFIND（Depth: 1）读取目录下所有文件的 ETag，目录不存在时返回 None"""
+        try:
+            response = self._request('list', remote_dir, directory=True)
+        except RemoteResourceNotFound:
+            return None
+        return {info['path'].rstrip('/').rsplit('/', 1)[-1]: info['etag']
+                for info in WebDavXmlUtils.parse_get_list_info_response(response.content)
+                if not info['isdir']}
+
+    # ---- 文件同步 ----
+
     def sync_to_cloud(self, local_file):
-        """将本地数据同步到WebDAV服务器"""
+        """将本地数据同步到WebDAV服务器，内容与上次传输相同时不上传"""
         try:
-            if os.path.exists(local_file):
-                remote_path = f'/tasks/{os.path.basename(local_file)}'
-                self.client.upload_sync(remote_path=remote_path, local_path=local_file)
-                self.logger.info(f"成功上传文件: {local_file}")
+            digest = file_hash(local_file)
+            if digest is None:
+                return False
+            remote_path = f'/tasks/{os.path.basename(local_file)}'
+            entry = self.manifest.get(remote_path)
+            if entry is not None and entry.sha256 == digest:
+                self.logger.info(f"文件内容未变化，跳过上传: {local_file}")
                 return True
+            with open(local_file, 'rb') as f:
+                etag = self._put(remote_path, f, entry.etag if entry else None)
+            self.manifest.set(remote_path, digest, etag)
+            self.logger.info(f"成功上传文件: {local_file}")
+            return True
+        except RemoteChanged:
+            self.logger.warning(f"远程文件已被修改，取消上传: {local_file}")
             return False
         except Exception as e:
             self.logger.error(f"上传失败: {str(e)}")
             return False
     
     def sync_from_cloud(self, remote_file, local_file):
-        """从WebDAV服务器同步数据到本地"""
+        """从WebDAV服务器同步数据到本地，远程未变化时服务器只返回 304"""
         try:
             remote_path = f'/tasks/{remote_file}'
-            if self.client.check(remote_path):
-                self.client.download_sync(remote_path=remote_path, local_path=local_file)
-                self.logger.info(f"成功下载文件: {remote_file}")
+            entry = self.manifest.get(remote_path)
+            # 只有本地文件仍是上次同步的内容时，才能用条件请求跳过下载
+            unchanged_locally = entry is not None and file_hash(local_file) == entry.sha256
+            data, etag = self._get(remote_path, entry.etag if unchanged_locally else None)
+            if data is None:
+                self.logger.info(f"远程文件未变化: {remote_file}")
                 return True
+            digest = content_hash(data)
+            if not (unchanged_locally and digest == entry.sha256):
+                # 先写入临时文件再替换，下载中断时不会留下不完整的本地文件
+                partial = f'{local_file}.part'
+                with open(partial, 'wb') as f:
+                    f.write(data)
+                os.replace(partial, local_file)
+            self.manifest.set(remote_path, digest, etag)
+            self.logger.info(f"成功下载文件: {remote_file}")
+            return True
+        except RemoteResourceNotFound:
             return False
         except Exception as e:
             self.logger.error(f"下载失败: {str(e)}")
@@ -114,74 +212,148 @@ class WebDAVSync(QObject):
                 self.logger.warning("自动同步失败")
     
     def resolve_conflict(self, local_file, remote_file):
-        """解决同步冲突"""
+        """解决同步冲突
+
+        与清单中上次传输的内容比较：本地内容哈希变化说明本地有修改，
+        远程 ETag 变化说明远程有修改。只有一方修改时按修改方向传输，
+        两方都未修改时不传输；两方都修改时才比较修改时间，保留较新的版本。
+        """
         try:
-            # 获取本地和远程文件的修改时间
+            remote_path = f'/tasks/{remote_file}'
+            entry = self.manifest.get(remote_path)
+            info = self._remote_info(remote_path)
+            if info is None:
+                return self.sync_to_cloud(local_file)
+            local_changed = entry is None or file_hash(local_file) != entry.sha256
+            # 服务器不提供 ETag 时无法判断，视为远程已修改
+            remote_changed = entry is None or not info['etag'] or info['etag'] != entry.etag
+
+            if not local_changed and not remote_changed:
+                return True
+            if not remote_changed:
+                return self.sync_to_cloud(local_file)
+            if not local_changed:
+                return self.sync_from_cloud(remote_file, local_file)
+
             local_mtime = os.path.getmtime(local_file)
-            remote_info = self.client.info(f'/tasks/{remote_file}')
-            remote_mtime = remote_info['modified']
-            
-            # 比较修改时间，保留最新版本
+            remote_mtime = parsedate_to_datetime(info['modified']).timestamp()
             if local_mtime > remote_mtime:
+                # 覆盖远程的修改：以当前远程 ETag 作为上传条件
+                self.manifest.set(remote_path, None, info['etag'])
                 return self.sync_to_cloud(local_file)
             else:
+                self.manifest.discard(remote_path)
                 return self.sync_from_cloud(remote_file, local_file)
         except Exception as e:
             self.logger.error(f"冲突解决失败: {str(e)}")
             return False
-            
+
+    # ---- 增量同步 ----
+
     def sync_tasks(self):
-        """同步任务数据"""
+        """增量同步：先下载其他设备的新批次，再上传本地尚未确认的修改
+
+        耗时与传输量只与修改的数量有关，与数据库大小无关；
+        没有任何修改时只需一次 PROPFIND 读取各设备批次编号文件的 ETag。
+        cancel_event 被设置时在下一个批次开始前停止并返回 False。
+        """
         if not self.connected:
             self.logger.warning("未连接WebDAV服务器")
             return False
             
         try:
-            # 导出本地任务数据
-            local_tasks = self.db.export_tasks()
-            temp_file = 'tasks_export.json'
-            with open(temp_file, 'w') as f:
-                json.dump(local_tasks, f)
-                
-            # 同步到云端
-            if not self.sync_to_cloud(temp_file):
-                return False
-                
-            # 检查远程是否有更新
-            remote_file = 'tasks.json'
-            if self.client.check(f'/tasks/{remote_file}'):
-                remote_info = self.client.info(f'/tasks/{remote_file}')
-                remote_mtime = remote_info['modified']
-                local_mtime = os.path.getmtime(temp_file)
-                
-                if remote_mtime > local_mtime:
-                    # 下载远程更新
-                    if not self.sync_from_cloud(remote_file, temp_file):
-                        return False
-                        
-                    # 导入远程任务数据
-                    with open(temp_file, 'r') as f:
-                        remote_tasks = json.load(f)
-                    self.db.import_tasks(remote_tasks)
-                    
-            os.remove(temp_file)
+            pulled = self.pull_changes()
+            pushed = self.push_changes()
+            self.logger.info(f"同步完成：应用 {pulled} 个远程批次，上传 {pushed} 个批次")
             return True
-            
+
+        except SyncCancelled:
+            self.logger.info("同步已取消")
+            return False
         except Exception as e:
             self.logger.error(f"任务同步失败: {str(e)}")
             return False
-            
-    def start_periodic_sync(self):
-        """启动定期同步"""
-        if not self.connected:
-            return False
-            
-        def sync_loop():
-            while True:
-                self.sync_tasks()
-                time.sleep(self.sync_interval)
-                
-        import threading
-        sync_thread = threading.Thread(target=sync_loop, daemon=True)
-        sync_thread.start()
-        return True
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise SyncCancelled()
+
+    def _ensure_remote_dirs(self):
+        for remote_dir in (CHANGES_DIR, HEADS_DIR):
+            if not self.client.check(remote_dir):
+                self.client.mkdir(remote_dir, recursive=True)
+
+    def pull_changes(self):
+        """下载并应用其他设备尚未应用过的批次，返回应用的批次数
+
+        每台设备在 HEADS_DIR 中有一个记录最新批次编号的小文件，
+        只有 ETag 与清单不同的设备才需要读取编号并下载新的批次。
+        """
+        self.progress.emit("检查远程修改")
+        head_etags = self._list_etags(HEADS_DIR)
+        if head_etags is None:
+            self._ensure_remote_dirs()
+            return 0
+        device = self.db.get_sync_device()
+        applied = self.db.get_sync_peers()
+        count = 0
+        for name, etag in sorted(head_etags.items()):
+            if name == device:
+                continue
+            head_path = HEADS_DIR + name
+            entry = self.manifest.get(head_path)
+            if entry is not None and etag and entry.etag == etag:
+                continue
+            data, etag = self._get(head_path, entry.etag if entry else None)
+            if data is None:
+                continue
+            for batch in range(applied.get(name, 0) + 1, parse_head(data) + 1):
+                self._check_cancelled()
+                self.progress.emit(f"下载远程修改：第 {count + 1} 批")
+                try:
+                    content, _ = self._get(CHANGES_DIR + batch_name(name, batch))
+                except RemoteResourceNotFound:
+                    # 上传失败而作废的编号
+                    continue
+                # 下载完成后再开始写事务，不在持有写锁时等待网络；
+                # 压缩数据逐块解码，每次只有一小批记录被解析成对象
+                header, records = read_batch(iter_chunks(content))
+                with self.db.transaction():
+                    for upserts, deletes in records:
+                        self.db.apply_sync_batch(name, batch, upserts, deletes)
+                count += 1
+            self.manifest.set(head_path, content_hash(data), etag)
+        return count
+
+    def push_changes(self):
+        """把本地修改按批上传，每批上传成功后立即批量标记为已同步，返回上传的批次数
+
+        之后更新本设备的批次编号文件。编号文件按 sync_state 中记录的已上传批次写入，
+        上次写入失败时即使这次没有新的修改也会重写；编号文件已是最新时不发出任何请求。
+        """
+        device = self.db.get_sync_device()
+        count = 0
+        try:
+            for upserts, deletes in self.db.iter_sync_changes():
+                self._check_cancelled()
+                self.progress.emit(f"上传本地修改：第 {count + 1} 批")
+                batch = self.db.allocate_sync_batch()
+                self._put(CHANGES_DIR + batch_name(device, batch),
+                          encode_batch(device, batch, upserts, deletes))
+                self.db.mark_changes_synced(upserts, deletes, batch)
+                count += 1
+        finally:
+            self._put_head(device)
+        return count
+
+    def _put_head(self, device):
+        """批次编号文件落后于已上传的批次时重新上传"""
+        uploaded = int(self.db.get_sync_state('uploaded_batch', 0))
+        if not uploaded:
+            return
+        head = encode_head(uploaded)
+        head_path = HEADS_DIR + device
+        entry = self.manifest.get(head_path)
+        if entry is not None and entry.sha256 == content_hash(head):
+            return
+        self.manifest.set(head_path, content_hash(head), self._put(head_path, head))